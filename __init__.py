@@ -157,12 +157,9 @@ class ObjectHomemaker(bpy.types.Operator):
             if not self.cellcomplex:
                 return {"FINISHED"}
 
-            # delete and replace the building containing this element
+            # regenerate the building containing this element
 
             self.ifc_building = get_parent_building(ifc_element)
-            self.structural_model = get_structural_analysis_model_by_name(
-                IfcStore.file, self.ifc_building, self.ifc_building.Name
-            )
             self.building_name = self.ifc_building.Name
 
             for collection in bpy.data.collections:
@@ -221,20 +218,16 @@ class ObjectHomemaker(bpy.types.Operator):
     def _execute(self, context):
         if self.action == "regenerate_ifc":
 
-            # remove the old building
-            delete_ifc_product(IfcStore.file, self.ifc_building)
-            delete_ifc_product(IfcStore.file, self.structural_model)
-            purge_unused(IfcStore.file)
-            clean_id_map()
-
-            # Molior objects build IFC buildings
+            # Molior objects build IFC buildings, only regenerating changed parts
             molior_object = Molior.from_cellcomplex(
                 file=IfcStore.file,
                 cellcomplex=self.cellcomplex,
                 name=self.building_name,
                 share_dir=self.share_dir,
             )
-            molior_object.execute()
+            molior_object.execute(incremental=True)
+            purge_unused(IfcStore.file)
+            clean_id_map()
         elif self.action == "generate_ifc":
             for blender_object in self.blender_objects:
 
@@ -0,0 +1,311 @@
+#!/usr/bin/python3
+
+"""benchmark - time each stage of building IFC models from synthetic geometry
+
+Buildings are generated parametrically at increasing sizes: grids of cells,
+terraces, courtyards and pitched-roof terraces, using styles from the 'share'
+folder.  Each stage of the pipeline is timed separately, results are written as
+JSON so regressions can be tracked across commits.
+
+Usage:
+    benchmark.py [--quick] [--repeat N] [--output results.json]
+
+"""
+import sys, os, json, time, argparse, platform, subprocess, tempfile
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from topologic import Vertex, Face, CellComplex
+from molior import Molior
+
+SHARE_DIR = os.path.join(os.path.abspath(os.path.dirname(__file__)), "share")
+USAGES = ["living", "kitchen", "bedroom", "toilet"]
+
+
+def grid_faces(cells, size=(5.0, 5.0, 3.0), stylename="default"):
+    """Faces bounding a set of (i, j, k) grid cells, shared faces only once"""
+    keys = {}
+    for cell in cells:
+        for axis in range(3):
+            for side in (0, 1):
+                key = list(cell) + [axis]
+                key[axis] += side
+                keys[tuple(key)] = True
+    faces_ptr = []
+    for x, y, z, axis in keys:
+        corner = [x * size[0], y * size[1], z * size[2]]
+        spans = [[0.0, 0.0, 0.0] for other in range(3) if other != axis]
+        for span, other in zip(spans, [other for other in range(3) if other != axis]):
+            span[other] = size[other]
+        points = [
+            corner,
+            [corner[axis] + spans[0][axis] for axis in range(3)],
+            [corner[axis] + spans[0][axis] + spans[1][axis] for axis in range(3)],
+            [corner[axis] + spans[1][axis] for axis in range(3)],
+        ]
+        faces_ptr.append(styled_face(points, stylename))
+    return faces_ptr
+
+
+def styled_face(points, stylename):
+    """A Face with a 'stylename' Dictionary attribute"""
+    face = Face.ByVertices([Vertex.ByCoordinates(*point) for point in points])
+    face.Set("stylename", stylename)
+    return face
+
+
+def widget(coor, usage):
+    """A Vertex with a 'usage' Dictionary attribute"""
+    vertex = Vertex.ByCoordinates(*coor)
+    vertex.Set("usage", usage)
+    return vertex
+
+
+def cell_widgets(cells, size=(5.0, 5.0, 3.0), stairs=()):
+    """Widgets at the centre of each cell, cycling through room usages, cells
+    in the (i, j) columns listed in 'stairs' are stair cells"""
+    widgets = []
+    for position, cell in enumerate(sorted(cells)):
+        usage = USAGES[position % len(USAGES)]
+        if cell[0:2] in stairs:
+            usage = "stair"
+        centre = [(cell[axis] + 0.5) * size[axis] for axis in range(3)]
+        widgets.append(widget(centre, usage))
+    return widgets
+
+
+def grid(n, m, k):
+    """An n x m x k block of cells with a stair in one corner"""
+    cells = [(i, j, level) for i in range(n) for j in range(m) for level in range(k)]
+    return grid_faces(cells), cell_widgets(cells, stairs=[(0, 0)])
+
+
+def terrace(houses, storeys=2):
+    """A row of two-cell deep houses, each with a stair"""
+    size = (5.0, 4.0, 3.0)
+    cells = [
+        (i, j, level)
+        for i in range(houses)
+        for j in range(2)
+        for level in range(storeys)
+    ]
+    stairs = [(i, 1) for i in range(houses)]
+    return grid_faces(cells, size, "halifax"), cell_widgets(cells, size, stairs)
+
+
+def courtyard(n, storeys=1):
+    """A ring of cells around an open courtyard, n cells along each side"""
+    cells = [
+        (i, j, level)
+        for i in range(n)
+        for j in range(n)
+        for level in range(storeys)
+        if i in (0, n - 1) or j in (0, n - 1)
+    ]
+    return grid_faces(cells, stylename="courtyard"), cell_widgets(cells)
+
+
+def pitched(houses, storeys=2):
+    """A terrace of single-cell deep houses with a pitched roof"""
+    size = (5.0, 6.0, 3.0)
+    cells = [(i, 0, level) for i in range(houses) for level in range(storeys)]
+    faces_ptr = grid_faces(cells, size, "simple")
+    eaves = storeys * size[2]
+    ridge = eaves + 2.5
+    for i in range(houses):
+        x0 = i * size[0]
+        x1 = x0 + size[0]
+        faces_ptr.append(
+            styled_face(
+                [
+                    [x0, 0.0, eaves],
+                    [x1, 0.0, eaves],
+                    [x1, 3.0, ridge],
+                    [x0, 3.0, ridge],
+                ],
+                "simple",
+            )
+        )
+        faces_ptr.append(
+            styled_face(
+                [
+                    [x0, 6.0, eaves],
+                    [x0, 3.0, ridge],
+                    [x1, 3.0, ridge],
+                    [x1, 6.0, eaves],
+                ],
+                "simple",
+            )
+        )
+    for i in range(houses + 1):
+        x = i * size[0]
+        faces_ptr.append(
+            styled_face([[x, 0.0, eaves], [x, 3.0, ridge], [x, 6.0, eaves]], "simple")
+        )
+    return faces_ptr, cell_widgets(cells, size)
+
+
+GENERATORS = {
+    "grid": grid,
+    "terrace": terrace,
+    "courtyard": courtyard,
+    "pitched": pitched,
+}
+
+SIZES = {
+    "quick": [
+        ["grid", [2, 2, 1]],
+        ["terrace", [3]],
+        ["courtyard", [4]],
+        ["pitched", [3]],
+    ],
+    "full": [
+        ["grid", [2, 2, 1]],
+        ["grid", [4, 4, 2]],
+        ["grid", [8, 8, 3]],
+        ["terrace", [4]],
+        ["terrace", [16]],
+        ["courtyard", [5]],
+        ["courtyard", [9, 2]],
+        ["pitched", [4]],
+        ["pitched", [16]],
+    ],
+}
+
+
+class Stopwatch:
+    """Accumulates elapsed time for named stages"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def time(self, stage, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        self.stages[stage] = self.stages.get(stage, 0.0) + time.perf_counter() - start
+        return result
+
+
+def run_pipeline(faces_ptr, widgets, name, share_dir=SHARE_DIR):
+    """Run each stage of Molior.from_faces_and_widgets() and Molior.execute()
+    separately, returns stage timings and model sizes"""
+    stopwatch = Stopwatch()
+    cellcomplex = stopwatch.time(
+        "CellComplex.ByFaces", CellComplex.ByFaces, faces_ptr, 0.0001
+    )
+    stopwatch.time("ApplyDictionary", cellcomplex.ApplyDictionary, faces_ptr)
+    stopwatch.time("AllocateCells", cellcomplex.AllocateCells, widgets)
+    stopwatch.time("IndexTopology", cellcomplex.IndexTopology)
+    stopwatch.time("BuildIndex", cellcomplex.BuildIndex)
+    circulation = stopwatch.time("Adjacency", cellcomplex.Adjacency)
+    stopwatch.time("Circulation", circulation.Circulation, cellcomplex)
+    table = stopwatch.time("ShortestPathTable", circulation.ShortestPathTable)
+    stopwatch.time("Separation", circulation.Separation, table, cellcomplex)
+    traces, normals, elevations = stopwatch.time("GetTraces", cellcomplex.GetTraces)
+    hulls = stopwatch.time("GetHulls", cellcomplex.GetHulls)
+    molior_object = stopwatch.time(
+        "Molior",
+        Molior,
+        circulation=circulation,
+        traces=traces,
+        elevations=elevations,
+        name=name,
+        hulls=hulls,
+        normals=normals,
+        cellcomplex=cellcomplex,
+        share_dir=share_dir,
+    )
+    stopwatch.time("execute", molior_object.build)
+    stopwatch.time("connect_structure", molior_object.connect_structure)
+    stopwatch.time("connect_spaces", molior_object.connect_spaces)
+    stopwatch.time("stash_topology", molior_object.stash_topology)
+    with tempfile.TemporaryDirectory() as directory:
+        stopwatch.time(
+            "file.write", molior_object.file.write, os.path.join(directory, "out.ifc")
+        )
+
+    faces_out = []
+    cellcomplex.Faces(None, faces_out)
+    cells_out = []
+    cellcomplex.Cells(None, cells_out)
+    return {
+        "stages": stopwatch.stages,
+        "total": sum(stopwatch.stages.values()),
+        "faces": len(faces_out),
+        "cells": len(cells_out),
+        "products": len(molior_object.file.by_type("IfcProduct")),
+        "entities": len(list(molior_object.file)),
+    }
+
+
+def benchmark(generator, params, repeat=1):
+    """Fastest of several runs for each stage"""
+    best = None
+    for iteration in range(repeat):
+        faces_ptr, widgets = GENERATORS[generator](*params)
+        result = run_pipeline(faces_ptr, widgets, generator)
+        if best == None:
+            best = result
+        else:
+            for stage in result["stages"]:
+                best["stages"][stage] = min(
+                    best["stages"][stage], result["stages"][stage]
+                )
+            best["total"] = sum(best["stages"].values())
+    best["generator"] = generator
+    best["params"] = params
+    best["repeat"] = repeat
+    return best
+
+
+def git_commit():
+    """Commit id of the code being benchmarked, or None"""
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--quick", action="store_true", help="small models only")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per model")
+    parser.add_argument("--output", help="JSON file, default is standard output")
+    args = parser.parse_args(argv)
+
+    results = []
+    for generator, params in SIZES["quick" if args.quick else "full"]:
+        result = benchmark(generator, params, repeat=args.repeat)
+        print(
+            generator,
+            params,
+            str(result["cells"]) + " cells",
+            "%.3fs" % result["total"],
+            file=sys.stderr,
+        )
+        results.append(result)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -9,31 +9,34 @@ Usage:
     brep2ifc.py mygeometry.brep mybuilding.ifc
 
 """
-import sys, os, datetime
+import sys, os
 
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from topologic import Topology, Vertex, TopologyUtility
 from molior import Molior
+from molior.report import Report, measure
 
-print("Start", datetime.datetime.now())
-brep_file = open(sys.argv[1], "r")
-topology = Topology.ByString(brep_file.read())
-print("BREP imported", datetime.datetime.now())
+report = Report()
+with measure(report, "Topology.ByString"):
+    brep_file = open(sys.argv[1], "r")
+    topology = Topology.ByString(brep_file.read())
 
 origin = Vertex.ByCoordinates(0.0, 0.0, 0.0)
 # topology_scaled = TopologyUtility.Scale(topology, origin, 0.3048, 0.3048, 0.3048)
-# print("BREP scale from feet to meters", datetime.datetime.now())
 topology_scaled = TopologyUtility.Scale(topology, origin, 1.0, 1.0, 1.0)
 
 faces_ptr = []
 topology_scaled.Faces(faces_ptr)
 
-print(str(len(faces_ptr)), "faces", datetime.datetime.now())
+print(str(len(faces_ptr)), "faces")
 
-molior_object = Molior.from_faces_and_widgets(faces=faces_ptr, name="brep2ifc building")
+molior_object = Molior.from_faces_and_widgets(
+    faces=faces_ptr, name="brep2ifc building", report=report
+)
 molior_object.execute()
 
-print("IFC model created", datetime.datetime.now())
+with measure(report, "file.write"):
+    molior_object.file.write(sys.argv[2])
 
-molior_object.file.write(sys.argv[2])
+print(report.summary())
@@ -15,10 +15,10 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from topologic import Vertex, Face, FaceUtility
 from molior import Molior
+from molior.report import Report, measure
 import ezdxf
-from pyinstrument import Profiler
 
-profiler = Profiler()
+report = Report()
 
 # convert DXF meshes into a list of Topologic Faces
 faces_ptr = []
@@ -34,13 +34,12 @@ for entity in model:
             if FaceUtility.Area(face_stl) > 0.00001:
                 faces_ptr.append(face_stl)
 
-profiler.start()
-
-molior_object = Molior.from_faces_and_widgets(faces=faces_ptr, name="dxf2ifc building")
+molior_object = Molior.from_faces_and_widgets(
+    faces=faces_ptr, name="dxf2ifc building", report=report
+)
 molior_object.execute()
 
-profiler.stop()
-
-molior_object.file.write(sys.argv[2])
+with measure(report, "file.write"):
+    molior_object.file.write(sys.argv[2])
 
-print(profiler.output_text(unicode=True, color=True))
+print(report.summary())
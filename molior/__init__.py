@@ -15,8 +15,16 @@ IfcOpenShell.
 
 """
 
+import os
 import re
+import copy
+import bisect
+import shutil
+import tempfile
+import multiprocessing
+import ifcopenshell
 import ifcopenshell.util
+import ifcopenshell.util.element
 from topologic import CellComplex, CellUtility, Vertex, Face, Topology
 from molior.extrusion import Extrusion
 from molior.floor import Floor
@@ -27,7 +35,18 @@ from molior.wall import Wall
 from molior.repeat import Repeat
 from molior.grillage import Grillage
 
-from molior.style import Style
+from molior.style import get_style
+from molior.report import Report, measure, measure_part
+from molior.fragment import (
+    Signatures,
+    match_faces,
+    match_cells,
+    trace_origin,
+    hull_origin,
+    trace_topology,
+    hull_topology,
+    index_maps,
+)
 from molior.geometry import subtract_3d, x_product_3d, matrix_align
 import molior.ifc
 from molior.ifc import (
@@ -38,71 +57,118 @@ from molior.ifc import (
     add_cell_topology_epsets,
     add_topologic_epsets,
     assign_space_byindex,
+    get_spaces_byindex,
+    get_topology_epsets,
     assign_storey_byindex,
     get_context_by_name,
     get_parent_building,
     create_tessellation_from_mesh,
+    delete_ifc_product,
+    get_id_marker,
+    create_fragment,
+    get_fragments,
+    get_fragment_products,
+    delete_fragment,
+    remap_topology_epsets,
+    release_contained_elements,
+    copy_products,
+    merge_file,
 )
 import topologist.ushell as ushell
 import topologist.ugraph as ugraph
+from topologist.helpers import el
 
 run = ifcopenshell.api.run
 
+# Molior object and jobs inherited by worker processes, see Molior.build_parallel()
+forked_jobs = None
+
 
 class Molior:
     """A Builder, has resources to build"""
 
     @classmethod
     def from_faces_and_widgets(
-        cls, file=None, faces=[], widgets=[], name="My Building", share_dir="share"
+        cls,
+        file=None,
+        faces=[],
+        widgets=[],
+        name="My Building",
+        share_dir="share",
+        report=None,
     ):
         """Create a Molior object from lists of Topologic Faces and widgets."""
         """Faces can have a 'style' Dictionary attribute."""
         """Widgets are Topologic Vertices with a 'usage' Dictionary attribute."""
+        """Timings are recorded in an optional molior.report.Report object."""
         # Generate a Topologic CellComplex
-        cellcomplex = CellComplex.ByFaces(faces, 0.0001)
+        with measure(report, "CellComplex.ByFaces"):
+            cellcomplex = CellComplex.ByFaces(faces, 0.0001)
 
         result = []
         cellcomplex.Faces(None, result)
         if result:
-            # Copy styles from Faces to the CellComplex
-            cellcomplex.ApplyDictionary(faces)
-            # Assign Cell usages from widgets
-            cellcomplex.AllocateCells(widgets)
+            with measure(report, "ApplyDictionary", topology=cellcomplex):
+                # Copy styles from Faces to the CellComplex
+                cellcomplex.ApplyDictionary(faces)
+                # Assign Cell usages from widgets
+                cellcomplex.AllocateCells(widgets)
             return cls.from_cellcomplex(
-                file=file, cellcomplex=cellcomplex, name=name, share_dir=share_dir
+                file=file,
+                cellcomplex=cellcomplex,
+                name=name,
+                share_dir=share_dir,
+                report=report,
             )
 
-        topology = Topology.ByFaces(faces, 0.0001)
+        with measure(report, "Topology.ByFaces"):
+            topology = Topology.ByFaces(faces, 0.0001)
 
         result = []
         topology.Faces(None, result)
         if result:
             # Copy styles from Faces to the Topology
-            topology.ApplyDictionary(faces)
+            with measure(report, "ApplyDictionary", topology=topology):
+                topology.ApplyDictionary(faces)
             return cls.from_topology(
-                file=file, topology=topology, name=name, share_dir=share_dir
+                file=file,
+                topology=topology,
+                name=name,
+                share_dir=share_dir,
+                report=report,
             )
 
     @classmethod
     def from_cellcomplex(
-        cls, file=None, cellcomplex=None, name="My Building", share_dir="share"
+        cls,
+        file=None,
+        cellcomplex=None,
+        name="My Building",
+        share_dir="share",
+        report=None,
     ):
         """Create a Molior object from a tagged CellComplex"""
         """Faces in the CellComplex can have a 'style' Dictionary attribute."""
         """Cells in the CellComplex can have a 'usage' Dictionary attribute."""
         # Give every Cell and Face an index number
-        cellcomplex.IndexTopology()
+        with measure(report, "IndexTopology", topology=cellcomplex):
+            cellcomplex.IndexTopology()
+            # Precalculate adjacency, speeds up all the classification that follows
+            cellcomplex.BuildIndex()
         # Generate a circulation Graph
-        circulation = cellcomplex.Adjacency()
-        circulation.Circulation(cellcomplex)
-        circulation.Separation(circulation.ShortestPathTable(), cellcomplex)
+        with measure(report, "Circulation", topology=cellcomplex):
+            circulation = cellcomplex.Adjacency()
+            circulation.Circulation(cellcomplex)
+        with measure(report, "ShortestPathTable", topology=cellcomplex):
+            circulation.Separation(circulation.ShortestPathTable(), cellcomplex)
 
         # Traces are 2D paths that define walls, extrusions and rooms
         # Hulls are 3D shells that define pitched roofs and soffits
         # Collect unique elevations and assign storey numbers
-        traces, normals, elevations = cellcomplex.GetTraces()
-        hulls = cellcomplex.GetHulls()
+        with measure(report, "GetTraces", topology=cellcomplex):
+            traces, normals, elevations = cellcomplex.GetTraces()
+        with measure(report, "GetHulls", topology=cellcomplex):
+            hulls = cellcomplex.GetHulls()
 
         return cls(
             file=file,
@@ -114,18 +180,27 @@ class Molior:
             normals=normals,
             cellcomplex=cellcomplex,
             share_dir=share_dir,
+            report=report,
         )
 
     @classmethod
     def from_topology(
-        cls, file=None, topology=None, name="My Building", share_dir="share"
+        cls,
+        file=None,
+        topology=None,
+        name="My Building",
+        share_dir="share",
+        report=None,
     ):
         """Create a Molior object from a tagged Topology"""
         """Faces in the CellComplex can have a 'style' Dictionary attribute."""
         # Give every Cell and Face an index number
-        topology.IndexTopology()
-        traces, normals, elevations = topology.GetTraces()
-        hulls = topology.GetHulls()
+        with measure(report, "IndexTopology", topology=topology):
+            topology.IndexTopology()
+        with measure(report, "GetTraces", topology=topology):
+            traces, normals, elevations = topology.GetTraces()
+        with measure(report, "GetHulls", topology=topology):
+            hulls = topology.GetHulls()
 
         return cls(
             file=file,
@@ -135,6 +210,7 @@ class Molior:
             hulls=hulls,
             normals=normals,
             share_dir=share_dir,
+            report=report,
         )
 
     @classmethod
@@ -216,9 +292,16 @@ class Molior:
         self.circulation = None
         self.cellcomplex = None
         self.share_dir = "share"
+        self.style_cache_dir = None
+        self.topology_epsets = {}
+        # ids of products kept from a previous execute()
+        self.kept_products = set()
+        # optional molior.report.Report, collects timings and counters
+        self.report = None
         for arg in args:
             self.__dict__[arg] = args[arg]
-        Molior.style = Style({"share_dir": self.share_dir})
+        # styles are shared by all Molior objects until files in share_dir change
+        Molior.style = get_style(self.share_dir, cache_dir=self.style_cache_dir)
 
     def init_building(self):
         """Create and relate Site, Building and Storey Spatial Element products, set as current building"""
@@ -227,6 +310,8 @@ class Molior:
         else:
             molior.ifc.create_default_contexts(self.file)
         self.project = self.file.by_type("IfcProject")[0]
+        # EPset_Topology values of new elements, used to connect them later
+        self.topology_epsets = get_topology_epsets(self.file)
         site = get_site_by_name(self.file, self.project, "Site " + self.name)
         self.building = get_building_by_name(self.file, site, self.name)
         self.structural_analysis_model = get_structural_analysis_model_by_name(
@@ -234,9 +319,50 @@ class Molior:
         )
         create_storeys(self.file, self.building, self.elevations)
 
-    def execute(self):
+    def execute(self, incremental=False, cache=False, processes=1):
         """Iterate through 'traces' and 'hulls' and populate an ifc 'file' object"""
+        """Products are grouped by the trace or hull that generated them, with
+        incremental=True only traces and hulls that changed since the previous
+        execute() are regenerated. With cache=True, products generated for a
+        trace or hull are copied to identical traces or hulls elsewhere. With
+        processes > 1, traces and hulls are built in parallel"""
+        if self.file == None:
+            self.file = molior.ifc.init()
+        with measure(self.report, "build", self.file, self.cellcomplex):
+            self.build(incremental=incremental, cache=cache, processes=processes)
+
+        # use the topologic model to connect stuff
+        if self.cellcomplex:
+            with measure(self.report, "connect_structure", self.file, self.cellcomplex):
+                self.connect_structure()
+            with measure(self.report, "connect_spaces", self.file, self.cellcomplex):
+                self.connect_spaces()
+            with measure(self.report, "stash_topology", self.file, self.cellcomplex):
+                self.stash_topology()
+
+    def build(self, incremental=False, cache=False, processes=1):
+        """Generate products for all the 'traces' and 'hulls', see execute()"""
         self.init_building()
+        # Fragments are only recorded when they might be reused
+        record = incremental or cache
+        signatures = None
+        if record:
+            signatures = Signatures(
+                circulation=self.circulation,
+                normals=self.normals,
+                elevations=self.elevations,
+                style=Molior.style,
+            )
+        shapes = None
+        if cache:
+            shapes = Signatures(
+                circulation=self.circulation,
+                normals=self.normals,
+                elevations=self.elevations,
+                style=Molior.style,
+                relative=True,
+            )
+        jobs = {}
         for condition in self.traces:
             for elevation in self.traces[condition]:
                 for height in self.traces[condition][elevation]:
@@ -244,27 +370,247 @@ class Molior:
                         for chain in self.traces[condition][elevation][height][
                             stylename
                         ]:
-                            self.build_trace(
-                                stylename=stylename,
-                                condition=condition,
-                                elevation=elevation,
-                                height=height,
-                                chain=chain,
+                            shape = None
+                            if shapes:
+                                shape = [
+                                    shapes.trace(
+                                        stylename, condition, elevation, height, chain
+                                    ),
+                                    trace_origin(chain),
+                                    trace_topology(chain),
+                                ]
+                            name = "trace/" + str(len(jobs))
+                            if signatures:
+                                name = signatures.trace(
+                                    stylename, condition, elevation, height, chain
+                                )
+                            add_job(
+                                jobs,
+                                name,
+                                self.build_trace,
+                                {
+                                    "stylename": stylename,
+                                    "condition": condition,
+                                    "elevation": elevation,
+                                    "height": height,
+                                    "chain": chain,
+                                },
+                                shape,
                             )
         for condition in self.hulls:
             for stylename in self.hulls[condition]:
                 for hull in self.hulls[condition][stylename]:
-                    self.build_hull(
-                        stylename=stylename,
-                        condition=condition,
-                        hull=hull,
+                    shape = None
+                    if shapes:
+                        shape = [
+                            shapes.hull(stylename, condition, hull),
+                            hull_origin(hull),
+                            hull_topology(hull),
+                        ]
+                    name = "hull/" + str(len(jobs))
+                    if signatures:
+                        name = signatures.hull(stylename, condition, hull)
+                    add_job(
+                        jobs,
+                        name,
+                        self.build_hull,
+                        {
+                            "stylename": stylename,
+                            "condition": condition,
+                            "hull": hull,
+                        },
+                        shape,
                     )
 
-        # use the topologic model to connect stuff
-        if self.cellcomplex:
-            self.connect_structure()
-            self.connect_spaces()
-            self.stash_topology()
+        kept = {}
+        if incremental:
+            kept = self.reuse_fragments(jobs)
+
+        names = [name for name in jobs if not name in kept]
+        if self.report and incremental:
+            self.report.count("incremental", True, len(kept))
+            self.report.count("incremental", False, len(names))
+        if processes > 1 and "fork" in multiprocessing.get_all_start_methods():
+            self.build_parallel(jobs, names, processes, record)
+        else:
+            self.build_jobs(jobs, names, record)
+
+    def build_jobs(self, jobs, names, record=True):
+        """Run the build_trace() and build_hull() jobs with these names,
+        optionally grouping the products of each job as a Fragment"""
+        # new entities have ascending ids, so ranges of ids identify products
+        ranges = []
+        fragment_cache = {}
+        for name in names:
+            method, args, shape = jobs[name]
+            if not record:
+                method(**args)
+                continue
+            start = get_id_marker(self.file)
+            if self.copy_cached(fragment_cache, shape):
+                if self.report:
+                    self.report.count("fragment cache", True)
+            else:
+                if self.report and shape:
+                    self.report.count("fragment cache", False)
+                method(**args)
+                if shape and not shape[0] in fragment_cache:
+                    fragment_cache[shape[0]] = [
+                        start,
+                        get_id_marker(self.file),
+                        shape,
+                        None,
+                    ]
+            ranges.append([start, get_id_marker(self.file), name])
+        if record:
+            self.record_fragments(ranges)
+
+    def build_parallel(self, jobs, names, processes, record=True):
+        """Run jobs in forked worker processes, each building a share of the
+        jobs into a separate IFC file, then merge these files into this building"""
+        global forked_jobs
+        forked_jobs = [self, jobs, record]
+        directory = tempfile.mkdtemp()
+        shares = [
+            [
+                names[position::processes],
+                os.path.join(directory, str(position) + ".ifc"),
+            ]
+            for position in range(processes)
+        ]
+        try:
+            with multiprocessing.get_context("fork").Pool(processes) as pool:
+                reports = pool.map(build_share, shares)
+            if self.report:
+                for parts, counters in reports:
+                    self.report.merge(parts, counters)
+            for share_names, path in shares:
+                merge_file(self.file, ifcopenshell.open(path), self.building)
+        finally:
+            forked_jobs = None
+            shutil.rmtree(directory)
+
+    def reuse_fragments(self, jobs):
+        """Keep Fragments from a previous execute() that match a job, delete the
+        rest along with anything derived from the whole CellComplex"""
+        fragments = get_fragments(self.file, self.building)
+        if not fragments:
+            # nothing was recorded, so start again
+            delete_ifc_product(self.file, self.structural_analysis_model)
+            delete_ifc_product(self.file, self.building)
+            self.init_building()
+            return {}
+
+        face_map, cell_map = self.match_stash()
+        self.remove_connections()
+        kept = {}
+        for name, group in fragments.items():
+            products = get_fragment_products(group)
+            if name in jobs and remap_topology_epsets(
+                self.file, products, face_map, cell_map
+            ):
+                kept[name] = group
+                self.kept_products.update([product.id() for product in products])
+            else:
+                delete_fragment(self.file, group)
+        return kept
+
+    def copy_cached(self, fragment_cache, shape):
+        """Copy the products of an identical trace or hull moved into place,
+        returns False if there is nothing suitable in the cache"""
+        if shape == None or fragment_cache.get(shape[0]) == None:
+            return False
+        entry = fragment_cache[shape[0]]
+        start, end, source, products = entry
+        if products == None:
+            products = [
+                product
+                for product in self.file.by_type("IfcProduct")
+                if start < product.id() < end
+            ]
+            entry[3] = products
+        face_map, cell_map = index_maps(source[2], shape[2])
+        if not remap_topology_epsets(
+            self.file, products, face_map, cell_map, check_only=True
+        ):
+            # this trace or hull uses topology outside the chain or shell
+            fragment_cache[shape[0]] = None
+            return False
+        offset = [shape[1][axis] - source[1][axis] for axis in range(3)]
+        copies = copy_products(self.file, products, offset)
+        remap_topology_epsets(self.file, copies, face_map, cell_map)
+        return True
+
+    def record_fragments(self, ranges):
+        """Group new products by the trace or hull that generated them, given a
+        list of [start id, end id, name] ranges"""
+        starts = [start for start, end, name in ranges]
+        products = {}
+        for product in self.file.by_type("IfcProduct"):
+            position = bisect.bisect(starts, product.id()) - 1
+            if position >= 0 and product.id() < ranges[position][1]:
+                products.setdefault(position, []).append(product)
+        for position in range(len(ranges)):
+            create_fragment(
+                self.file, self.building, ranges[position][2], products.get(position)
+            )
+
+    def get_stash(self):
+        """The CellComplex Virtual Element created by stash_topology(), or None"""
+        for rel_contained in self.building.ContainsElements:
+            for element in rel_contained.RelatedElements:
+                if element.is_a("IfcVirtualElement") and element.Name == "CellComplex":
+                    return element
+        return None
+
+    def match_stash(self):
+        """Match Face and Cell indices of the stashed CellComplex to the current
+        CellComplex, returns dictionaries of new indices for old indices"""
+        faces = {}
+        points = {}
+        stash = self.get_stash()
+        if stash:
+            for rel_aggregates in stash.IsDecomposedBy:
+                for element in rel_aggregates.RelatedObjects:
+                    items = element.Name.split("/")
+                    item = element.Representation.Representations[0].Items[0]
+                    if items[0] == "face":
+                        dictionary = ifcopenshell.util.element.get_psets(element).get(
+                            "EPset_Topologic_Dictionary", {}
+                        )
+                        faces[items[1]] = [
+                            item.Coordinates.CoordList,
+                            dictionary.get("stylename"),
+                        ]
+                    elif items[0] == "cell":
+                        points[items[1]] = item.Coordinates
+        if self.cellcomplex == None:
+            return {}, {}
+        return (
+            match_faces(self.cellcomplex, faces),
+            match_cells(self.cellcomplex, points),
+        )
+
+    def remove_connections(self):
+        """Delete products derived from the whole CellComplex: the stash, Void
+        Spaces and Structural Connections, these are always regenerated"""
+        delete_ifc_product(self.file, self.get_stash())
+        for space in self.file.by_type("IfcSpace"):
+            if (
+                space.Name
+                and re.match("^void-space/", space.Name)
+                and get_parent_building(space) == self.building
+            ):
+                release_contained_elements(self.file, space)
+                delete_ifc_product(self.file, space)
+        connections = [
+            item
+            for rel in self.structural_analysis_model.IsGroupedBy
+            for item in rel.RelatedObjects
+            if item.is_a("IfcStructuralConnection")
+        ]
+        for connection in connections:
+            delete_ifc_product(self.file, connection)
 
     def connect_structure(self):
         """Given Structural Member entities are tagged with Topologic indexes, connect them"""
@@ -283,35 +629,114 @@ class Molior:
 
         # lookup tables to connect members to face indices
         surface_lookup = {}
-        curve_list = []
+        curve_lookup = {}
         for member in self.file.by_type("IfcStructuralSurfaceMember"):
             if get_parent_building(member) == self.building:
                 member.ObjectPlacement = structural_placement
-                pset_topology = ifcopenshell.util.element.get_psets(member).get(
-                    "EPset_Topology"
-                )
+                pset_topology = self.topology_epsets.get(member)
                 if pset_topology:
                     surface_lookup[pset_topology["FaceIndex"]] = member
+        # TODO merge duplicate columns, each may belong to a different Fragment
         for member in self.file.by_type("IfcStructuralCurveMember"):
             if get_parent_building(member) == self.building:
                 member.ObjectPlacement = structural_placement
-                pset_topology = ifcopenshell.util.element.get_psets(member).get(
-                    "EPset_Topology"
-                )
+                pset_topology = self.topology_epsets.get(member)
                 if pset_topology:
-                    curve_list.append([pset_topology["FaceIndex"], member])
+                    if not pset_topology["FaceIndex"] in curve_lookup:
+                        curve_lookup[pset_topology["FaceIndex"]] = []
+                    curve_lookup[pset_topology["FaceIndex"]].append(member)
 
-        # iterate all the edges in the topologic model
+        # iterate all the edges in the topologic model, working out which
+        # members each edge joins before creating any connections
         edges_ptr = []
         self.cellcomplex.Edges(None, edges_ptr)
-        point_list = []
+        edge_lookup = {}
+        point_lookup = {}
         for edge in edges_ptr:
-            v_start = edge.StartVertex()
-            v_end = edge.EndVertex()
-            start = v_start.Coordinates()
-            end = v_end.Coordinates()
+            start = edge.StartVertex().Coordinates()
+            end = edge.EndVertex().Coordinates()
+
+            # coincident edges share a single connection
+            edge_key = frozenset(
+                [tuple(el(value) for value in start), tuple(el(value) for value in end)]
+            )
+            if not edge_key in edge_lookup:
+                edge_lookup[edge_key] = {
+                    "start": start,
+                    "end": end,
+                    "members": [],
+                    "is_footing": False,
+                }
+            connection = edge_lookup[edge_key]
+            is_horizontal = abs(start[2] - end[2]) < 0.0001
+
+            # loop though all the faces connected to this edge
+            for face in edge.Faces_Cached(self.cellcomplex):
+                index = face.Get("index")
+                if index == None:
+                    continue
+                # connect this surface member to this curve connection
+                if index in surface_lookup:
+                    if not surface_lookup[index] in connection["members"]:
+                        connection["members"].append(surface_lookup[index])
+                if not is_horizontal:
+                    continue
+                # there are curve members with this face index
+                for curve_member in curve_lookup.get(index, []):
+                    connection_elevation = start[2]
+                    curve_edge = curve_member.Representation.Representations[0].Items[0]
+                    start_coors = curve_edge.EdgeStart.VertexGeometry.Coordinates
+                    end_coors = curve_edge.EdgeEnd.VertexGeometry.Coordinates
 
-            # create an ifc curve connection for this topologic edge
+                    # member is horizontal and coincides with this horizontal connection
+                    if (
+                        abs(start_coors[2] - connection_elevation) < 0.001
+                        and abs(end_coors[2] - connection_elevation) < 0.001
+                    ):
+                        if not curve_member in connection["members"]:
+                            connection["members"].append(curve_member)
+                        # footings can have XYZ fixity
+                        for referenced_by in curve_member.ReferencedBy:
+                            for related_object in referenced_by.RelatedObjects:
+                                if related_object.is_a("IfcFooting"):
+                                    connection["is_footing"] = True
+
+                    # FIXME connect ends of horizontal members to other members
+                    # member is non-horizontal, but one end coincides with this horizontal connection
+                    elif (
+                        abs(start_coors[2] - connection_elevation) < 0.001
+                        or abs(end_coors[2] - connection_elevation) < 0.001
+                    ):
+                        # start point of non-horizontal curve member coincides with this horizontal connection
+                        if abs(start_coors[2] - connection_elevation) < 0.001:
+                            point_connection_name = "Column base connection"
+                            point_coordinates = start_coors
+                        # end point of non-horizontal curve member coincides with this horizontal connection
+                        else:
+                            point_connection_name = "Column head connection"
+                            point_coordinates = end_coors
+
+                        # coincident point connections are merged
+                        point_key = tuple(el(value) for value in point_coordinates)
+                        if not point_key in point_lookup:
+                            point_lookup[point_key] = {
+                                "name": point_connection_name,
+                                "coordinates": point_coordinates,
+                                "members": [],
+                                "edges": [],
+                            }
+                        point = point_lookup[point_key]
+                        if not curve_member in point["members"]:
+                            point["members"].append(curve_member)
+                        if not edge_key in point["edges"]:
+                            point["edges"].append(edge_key)
+
+        # create curve connections only where two or more members are joined
+        for connection in edge_lookup.values():
+            if len(connection["members"]) < 2:
+                continue
+            start = connection["start"]
+            end = connection["end"]
             curve_connection = run(
                 "root.create_entity",
                 self.file,
@@ -358,184 +783,100 @@ class Molior:
                     ],
                 ),
             )
-            # TODO merge duplicate columns
-
-            # loop though all the faces connected to this edge
-            faces_ptr = edge.Faces_Cached(self.cellcomplex)
-            for face in faces_ptr:
-                index = face.Get("index")
-                # connect this surface member to this curve connection
-                if not index == None and index in surface_lookup:
-                    surface_member = surface_lookup[index]
-                    run(
-                        "structural.add_structural_member_connection",
-                        self.file,
-                        relating_structural_member=surface_member,
-                        related_structural_connection=curve_connection,
-                    )
-                # there is a curve member with this face index
-                for item in curve_list:
-                    curve_index = item[0]
-                    curve_member = item[1]
-                    if not curve_index == index:
-                        continue
-                    # if index in curve_list:
-                    if curve_connection.Name == "Horizontal connection":
-                        connection_elevation = start[2]
-                        curve_edge = curve_member.Representation.Representations[
-                            0
-                        ].Items[0]
-                        start_coors = curve_edge.EdgeStart.VertexGeometry.Coordinates
-                        end_coors = curve_edge.EdgeEnd.VertexGeometry.Coordinates
-
-                        # member is horizontal and coincides with this horizontal connection
-                        if (
-                            abs(start_coors[2] - connection_elevation) < 0.001
-                            and abs(end_coors[2] - connection_elevation) < 0.001
-                        ):
-                            run(
-                                "structural.add_structural_member_connection",
-                                self.file,
-                                relating_structural_member=curve_member,
-                                related_structural_connection=curve_connection,
-                            )
-                            # footings can have XYZ fixity, do it
-                            is_footing = False
-                            for referenced_by in curve_member.ReferencedBy:
-                                for related_object in referenced_by.RelatedObjects:
-                                    if related_object.is_a("IfcFooting"):
-                                        is_footing = True
-                            if is_footing:
-                                run(
-                                    "structural.add_structural_boundary_condition",
-                                    self.file,
-                                    name="foundation",
-                                    connection=curve_connection,
-                                )
-                                run(
-                                    "structural.edit_structural_boundary_condition",
-                                    self.file,
-                                    condition=curve_connection.AppliedCondition,
-                                    attributes={
-                                        "TranslationalStiffnessByLengthX": {
-                                            "type": "IfcBoolean",
-                                            "value": True,
-                                        },
-                                        "TranslationalStiffnessByLengthY": {
-                                            "type": "IfcBoolean",
-                                            "value": True,
-                                        },
-                                        "TranslationalStiffnessByLengthZ": {
-                                            "type": "IfcBoolean",
-                                            "value": True,
-                                        },
-                                        "RotationalStiffnessByLengthX": {
-                                            "type": "IfcBoolean",
-                                            "value": False,
-                                        },
-                                        "RotationalStiffnessByLengthY": {
-                                            "type": "IfcBoolean",
-                                            "value": False,
-                                        },
-                                        "RotationalStiffnessByLengthZ": {
-                                            "type": "IfcBoolean",
-                                            "value": False,
-                                        },
-                                    },
-                                )
-
-                        # FIXME connect ends of horizontal members to other members
-                        # member is non-horizontal, but one end coincides with this horizontal connection
-                        elif (
-                            abs(start_coors[2] - connection_elevation) < 0.001
-                            or abs(end_coors[2] - connection_elevation) < 0.001
-                        ):
-
-                            # start point of non-horizontal curve member coincides with this horizontal connection
-                            if abs(start_coors[2] - connection_elevation) < 0.001:
-                                point_connection_name = "Column base connection"
-                                point_coordinates = start_coors
-
-                            # end point of non-horizontal curve member coincides with this horizontal connection
-                            elif abs(start_coors[2] - connection_elevation) > 0.001:
-                                point_connection_name = "Column head connection"
-                                point_coordinates = end_coors
-
-                            point_connection = run(
-                                "root.create_entity",
-                                self.file,
-                                ifc_class="IfcStructuralPointConnection",
-                                name=point_connection_name,
-                            )
-                            point_connection.ObjectPlacement = structural_placement
-                            run(
-                                "geometry.assign_representation",
-                                self.file,
-                                product=point_connection,
-                                representation=self.file.createIfcTopologyRepresentation(
-                                    reference_context,
-                                    reference_context.ContextIdentifier,
-                                    "Vertex",
-                                    [
-                                        self.file.createIfcVertexPoint(
-                                            self.file.createIfcCartesianPoint(
-                                                point_coordinates
-                                            )
-                                        ),
-                                    ],
-                                ),
-                            )
-                            run(
-                                "structural.assign_structural_analysis_model",
-                                self.file,
-                                product=point_connection,
-                                structural_analysis_model=self.structural_analysis_model,
-                            )
-                            run(
-                                "structural.add_structural_member_connection",
-                                self.file,
-                                relating_structural_member=curve_member,
-                                related_structural_connection=point_connection,
-                            )
-                            point_list.append([point_connection, curve_connection])
-
-        # TODO merge coincident Point Connections
-        # attach column point connections to beams/footings/slabs/walls
-        for item in point_list:
-            connection_point = item[0]
-            connection_curve = item[1]
-            for rel in connection_curve.ConnectsStructuralMembers:
-                member = rel.RelatingStructuralMember
+            for member in connection["members"]:
                 run(
                     "structural.add_structural_member_connection",
                     self.file,
                     relating_structural_member=member,
-                    related_structural_connection=connection_point,
+                    related_structural_connection=curve_connection,
+                )
+            if connection["is_footing"]:
+                run(
+                    "structural.add_structural_boundary_condition",
+                    self.file,
+                    name="foundation",
+                    connection=curve_connection,
+                )
+                run(
+                    "structural.edit_structural_boundary_condition",
+                    self.file,
+                    condition=curve_connection.AppliedCondition,
+                    attributes={
+                        "TranslationalStiffnessByLengthX": {
+                            "type": "IfcBoolean",
+                            "value": True,
+                        },
+                        "TranslationalStiffnessByLengthY": {
+                            "type": "IfcBoolean",
+                            "value": True,
+                        },
+                        "TranslationalStiffnessByLengthZ": {
+                            "type": "IfcBoolean",
+                            "value": True,
+                        },
+                        "RotationalStiffnessByLengthX": {
+                            "type": "IfcBoolean",
+                            "value": False,
+                        },
+                        "RotationalStiffnessByLengthY": {
+                            "type": "IfcBoolean",
+                            "value": False,
+                        },
+                        "RotationalStiffnessByLengthZ": {
+                            "type": "IfcBoolean",
+                            "value": False,
+                        },
+                    },
                 )
 
-        # delete unused curve connections
-        for curve_connection in self.file.by_type("IfcStructuralCurveConnection"):
-            if len(curve_connection.ConnectsStructuralMembers) < 2:
-                for relation in curve_connection.ConnectsStructuralMembers:
-                    run(
-                        "structural.remove_structural_connection_condition",
-                        self.file,
-                        relation=relation,
-                    )
-                run("root.remove_product", self.file, product=curve_connection)
+        # attach column point connections to columns and beams/footings/slabs/walls
+        for point in point_lookup.values():
+            point_connection = run(
+                "root.create_entity",
+                self.file,
+                ifc_class="IfcStructuralPointConnection",
+                name=point["name"],
+            )
+            point_connection.ObjectPlacement = structural_placement
+            run(
+                "geometry.assign_representation",
+                self.file,
+                product=point_connection,
+                representation=self.file.createIfcTopologyRepresentation(
+                    reference_context,
+                    reference_context.ContextIdentifier,
+                    "Vertex",
+                    [
+                        self.file.createIfcVertexPoint(
+                            self.file.createIfcCartesianPoint(point["coordinates"])
+                        ),
+                    ],
+                ),
+            )
+            run(
+                "structural.assign_structural_analysis_model",
+                self.file,
+                product=point_connection,
+                structural_analysis_model=self.structural_analysis_model,
+            )
+            members = list(point["members"])
+            for edge_key in point["edges"]:
+                for member in edge_lookup[edge_key]["members"]:
+                    if not member in members:
+                        members.append(member)
+            for member in members:
+                run(
+                    "structural.add_structural_member_connection",
+                    self.file,
+                    relating_structural_member=member,
+                    related_structural_connection=point_connection,
+                )
 
     def connect_spaces(self):
         """Given objects and boundaries are tagged with Topologic indexes, assign them to correct spaces"""
         body_context = get_context_by_name(self.file, context_identifier="Body")
 
-        space_lookup = {}
-        for space in self.file.by_type("IfcSpace"):
-            if get_parent_building(space) == self.building:
-                pset_topology = ifcopenshell.util.element.get_psets(space).get(
-                    "EPset_Topology"
-                )
-                if pset_topology:
-                    space_lookup[pset_topology["CellIndex"]] = space
+        space_lookup = get_spaces_byindex(self.file, self.building)
 
         # create Space elements for Cells that don't already have one
         cells_ptr = []
@@ -559,16 +900,14 @@ class Molior:
                 if elevation in self.elevations:
                     level = self.elevations[elevation]
                 storey = assign_storey_byindex(self.file, element, self.building, level)
-                vertices, faces = cell.Mesh()
+                vertices, faces = cell.MeshArrays()
                 # not sure why this is necessary
-                vertices_shifted = [
-                    [v[0], v[1], v[2] - storey.Elevation] for v in vertices
-                ]
+                vertices[:, 2] -= storey.Elevation
                 shape = self.file.createIfcShapeRepresentation(
                     body_context,
                     body_context.ContextIdentifier,
                     "Tessellation",
-                    [create_tessellation_from_mesh(self.file, vertices_shifted, faces)],
+                    [create_tessellation_from_mesh(self.file, vertices, faces)],
                 )
                 style = run("style.add_style", self.file, name="Void Space")
                 run(
@@ -613,18 +952,23 @@ class Molior:
                     if len(items) == 2 and items[0] == "CellIndex":
                         if items[1] in space_lookup:
                             boundary.RelatingSpace = space_lookup[items[1]]
-                            # there ought to be a better way..
-                            storey_elevation = boundary.RelatingSpace.Decomposes[
-                                0
-                            ].RelatingObject.Elevation
-                            coor = (
-                                boundary.ConnectionGeometry.SurfaceOnRelatingElement.BasisSurface.Position.Location.Coordinates
-                            )
-                            boundary.ConnectionGeometry.SurfaceOnRelatingElement.BasisSurface.Position.Location.Coordinates = (
-                                coor[0],
-                                coor[1],
-                                coor[2] - storey_elevation,
-                            )
+                            # kept boundaries are already relative to the storey
+                            if (
+                                not boundary.RelatedBuildingElement.id()
+                                in self.kept_products
+                            ):
+                                # there ought to be a better way..
+                                storey_elevation = boundary.RelatingSpace.Decomposes[
+                                    0
+                                ].RelatingObject.Elevation
+                                coor = (
+                                    boundary.ConnectionGeometry.SurfaceOnRelatingElement.BasisSurface.Position.Location.Coordinates
+                                )
+                                boundary.ConnectionGeometry.SurfaceOnRelatingElement.BasisSurface.Position.Location.Coordinates = (
+                                    coor[0],
+                                    coor[1],
+                                    coor[2] - storey_elevation,
+                                )
                 for (
                     element_boundary
                 ) in boundary.RelatedBuildingElement.ProvidesBoundaries:
@@ -638,9 +982,7 @@ class Molior:
         # molior.floor attaches elements directly to Storey, re-attach to relevant Space
         for element in self.file.by_type("IfcBuildingElement"):
             if get_parent_building(element) == self.building:
-                pset_topology = ifcopenshell.util.element.get_psets(element).get(
-                    "EPset_Topology"
-                )
+                pset_topology = self.topology_epsets.get(element)
                 if pset_topology and "CellIndex" in pset_topology:
                     assign_space_byindex(
                         self.file, element, self.building, pset_topology["CellIndex"]
@@ -649,9 +991,7 @@ class Molior:
         # attach Window elements to relevant Space
         for element in self.file.by_type("IfcWindow"):
             if get_parent_building(element) == self.building:
-                pset_topology = ifcopenshell.util.element.get_psets(element).get(
-                    "EPset_Topology"
-                )
+                pset_topology = self.topology_epsets.get(element)
                 if pset_topology:
                     assign_space_byindex(
                         self.file,
@@ -669,9 +1009,7 @@ class Molior:
         # attach Door elements to Space
         for element in self.file.by_type("IfcDoor"):
             if get_parent_building(element) == self.building:
-                pset_topology = ifcopenshell.util.element.get_psets(element).get(
-                    "EPset_Topology"
-                )
+                pset_topology = self.topology_epsets.get(element)
                 if pset_topology:
                     if not "FrontCellIndex" in pset_topology or (
                         "FrontCellIndex" in pset_topology
@@ -691,16 +1029,17 @@ class Molior:
                             pset_topology["FrontCellIndex"],
                         )
                     else:
-                        if cell_lookup[pset_topology["FrontCellIndex"]].Get(
-                            "separation"
-                        ) and float(
-                            cell_lookup[pset_topology["FrontCellIndex"]].Get(
-                                "separation"
-                            )
-                        ) > float(
-                            cell_lookup[pset_topology["BackCellIndex"]].Get(
-                                "separation"
-                            )
+                        # cells in disconnected parts of the building may have no separation
+                        front_separation = cell_lookup[
+                            pset_topology["FrontCellIndex"]
+                        ].Get("separation")
+                        back_separation = cell_lookup[
+                            pset_topology["BackCellIndex"]
+                        ].Get("separation")
+                        if (
+                            front_separation
+                            and back_separation
+                            and float(front_separation) > float(back_separation)
                         ):
                             assign_space_byindex(
                                 self.file,
@@ -872,7 +1211,8 @@ class Molior:
                     "style_families": myconfig["families"],
                     "style_object": Molior.style,
                 }
-                vals.update(config)
+                # style data is shared between parts, each gets its own copy
+                vals.update(copy.deepcopy(config))
                 modules = {
                     "Extrusion": Extrusion,
                     "Floor": Floor,
@@ -881,9 +1221,9 @@ class Molior:
                     "Wall": Wall,
                     "Repeat": Repeat,
                 }
-                part = modules[config["class"]](vals)
-
-                part.execute()
+                with measure_part(self.report, config["class"], self.file):
+                    part = modules[config["class"]](vals)
+                    part.execute()
                 # results are only used by test suite
                 results.append(part)
         return results
@@ -909,11 +1249,38 @@ class Molior:
                     "style_families": myconfig["families"],
                     "style_object": Molior.style,
                 }
-                vals.update(config)
+                # style data is shared between parts, each gets its own copy
+                vals.update(copy.deepcopy(config))
                 modules = {"Shell": Shell, "Grillage": Grillage}
-                part = modules[config["class"]](vals)
-
-                part.execute()
+                with measure_part(self.report, config["class"], self.file):
+                    part = modules[config["class"]](vals)
+                    part.execute()
                 # results are only used by test suite
                 results.append(part)
         return results
+
+
+def add_job(jobs, signature, method, args, shape=None):
+    """Queue a build_trace() or build_hull() call, identical traces or hulls get
+    numbered signatures. shape is a relative signature, origin and topology list"""
+    name = signature
+    count = 1
+    while name in jobs:
+        count += 1
+        name = signature + "/" + str(count)
+    jobs[name] = [method, args, shape]
+
+
+def build_share(share):
+    """Worker process, builds a share of the jobs into a new IFC file"""
+    names, path = share
+    molior_object, jobs, record = forked_jobs
+    molior_object.file = None
+    if molior_object.report:
+        molior_object.report = Report()
+    molior_object.init_building()
+    molior_object.build_jobs(jobs, names, record)
+    molior_object.file.write(path)
+    if molior_object.report:
+        return [molior_object.report.parts, molior_object.report.counters]
+    return [{}, {}]
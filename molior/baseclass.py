@@ -12,6 +12,7 @@ from molior.geometry import (
     line_intersection,
 )
 from molior.ifc import add_pset
+from topologist.helpers import coor_to_key
 
 run = ifcopenshell.api.run
 
@@ -115,12 +116,12 @@ class TraceClass(BaseClass):
         # deal with ends of open paths
         if not self.closed and index in (len(self.path) - 1, 0):
             coor = self.corner_coor(index)
-            string = str(coor[0]) + "__" + str(coor[1]) + "__" + str(self.elevation)
+            key = coor_to_key([coor[0], coor[1], self.elevation])
             if self.normal_set in self.normals:
                 normal_map = self.normals[self.normal_set]
-                if self.condition == "external" and string in normal_map:
+                if self.condition == "external" and key in normal_map:
                     # we have a stashed normal for this corner
-                    line_mitre = points_2line(coor, add_2d(coor, normal_map[string]))
+                    line_mitre = points_2line(coor, add_2d(coor, normal_map[key]))
                     if index == len(self.path) - 1:
                         return line_intersection(line_a, line_mitre)
                     if index == 0:
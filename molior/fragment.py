@@ -0,0 +1,273 @@
+"""Fragments are the IFC products generated from a single trace or hull
+
+Each fragment is labelled with a signature, a digest of everything the trace
+or hull is built from: its geometry, the styles, usages and circulation of the
+Faces and Cells it touches, corner normals and the style definition.  A
+fragment with an unchanged signature doesn't need to be regenerated.
+
+Face and Cell index numbers are not part of the signature, since these change
+whenever the CellComplex is edited.  Instead, the indices of a stashed
+CellComplex are matched to the new CellComplex by geometry.
+
+Relative signatures measure geometry from the start of each trace or hull, so
+identical traces or hulls in different locations share a signature.  These
+are used to cache fragments, a copy of the products generated for one trace
+or hull can be moved into place instead of building another.
+
+"""
+
+import hashlib
+from topologic import CellUtility, Vertex
+import topologist.grid
+from topologist.helpers import el, coor_to_key
+
+
+def geometry_key(coordinates, origin=(0.0, 0.0, 0.0)):
+    """An order-independent key for a list of coordinates, rounded to millimetres"""
+    return tuple(
+        sorted(
+            tuple(el(coor[axis] - origin[axis]) for axis in range(3))
+            for coor in coordinates
+        )
+    )
+
+
+def trace_origin(chain):
+    """Horizontal position of the start of a trace, a ugraph chain"""
+    for node in chain.graph:
+        coor = chain.graph[node][1]["start_vertex"].Coordinates()
+        return (coor[0], coor[1], 0.0)
+    return (0.0, 0.0, 0.0)
+
+
+def hull_origin(hull):
+    """Horizontal position of the first node of a hull, a ushell shell"""
+    for facet in hull.faces:
+        coor = hull.coordinates[facet[0][0]]
+        return (coor[0], coor[1], 0.0)
+    return (0.0, 0.0, 0.0)
+
+
+def trace_topology(chain):
+    """Faces and Cells used by a trace, in order"""
+    return [
+        [chain.graph[node][1][key] for key in ["face", "back_cell", "front_cell"]]
+        for node in chain.graph
+    ]
+
+
+def hull_topology(hull):
+    """Faces and Cells used by a hull, in order"""
+    return [
+        [facet[1][key] for key in ["face", "back_cell", "front_cell"]]
+        for facet in hull.faces
+    ]
+
+
+def index_maps(source, target):
+    """Given Faces and Cells used by two identical traces or hulls, returns
+    dictionaries of target Face and Cell indices for source indices"""
+    face_map = {}
+    cell_map = {}
+    for source_items, target_items in zip(source, target):
+        for position in range(3):
+            mymap = cell_map
+            if position == 0:
+                mymap = face_map
+            if source_items[position] and target_items[position]:
+                index = source_items[position].Get("index")
+                if index != None:
+                    mymap[str(index)] = str(target_items[position].Get("index"))
+    return face_map, cell_map
+
+
+def digest(items):
+    """A short hexadecimal digest of a nested list of values"""
+    return hashlib.sha1(repr(items).encode()).hexdigest()
+
+
+class Signatures:
+    """Signatures for the traces and hulls of a Molior object, Face and Cell
+    signatures are cached since they are shared by many traces and hulls.
+    With relative=True, geometry is measured from the start of each trace or hull"""
+
+    def __init__(
+        self, circulation=None, normals={}, elevations={}, style=None, relative=False
+    ):
+        self.circulation = circulation
+        self.normals = normals
+        self.elevations = elevations
+        self.style = style
+        self.relative = relative
+        self.origin = (0.0, 0.0, 0.0)
+        self.faces = {}
+        self.cells = {}
+        self.styles = {}
+
+    def face(self, face):
+        """Geometry, stylename and circulation of a Face"""
+        if face == None:
+            return None
+        index = face.Get("index")
+        if index != None:
+            index = (index, self.origin)
+        if index == None or not index in self.faces:
+            vertices, faces = face.Mesh()
+            graph_vertex = None
+            if self.circulation:
+                graph_vertex = face.GraphVertex(self.circulation)
+            signature = (
+                geometry_key(vertices, self.origin),
+                face.Get("stylename"),
+                graph_vertex != None,
+            )
+            if index == None:
+                return signature
+            self.faces[index] = signature
+        return self.faces[index]
+
+    def cell(self, cell, separation=False):
+        """Geometry and usage of a Cell, optionally with its separation. This
+        changes for most Cells whenever circulation is edited, so it is only
+        included for traces that use it"""
+        if cell == None:
+            return None
+        if separation:
+            return self.cell(cell) + (cell.Get("separation"),)
+        index = cell.Get("index")
+        if index != None:
+            index = (index, self.origin)
+        if index == None or not index in self.cells:
+            vertices_ptr = []
+            cell.Vertices(None, vertices_ptr)
+            signature = (
+                geometry_key(
+                    [vertex.Coordinates() for vertex in vertices_ptr], self.origin
+                ),
+                cell.Get("usage"),
+            )
+            if index == None:
+                return signature
+            self.cells[index] = signature
+        return self.cells[index]
+
+    def stylename(self, stylename):
+        """Digest of a flattened style definition"""
+        if not stylename in self.styles:
+            config = None
+            if self.style:
+                config = self.style.get(stylename)
+            self.styles[stylename] = digest(config)
+        return self.styles[stylename]
+
+    def uses_separation(self, stylename, condition):
+        """Do traces with this style and condition generate Spaces, these
+        record the separation of the Cell"""
+        if not self.style:
+            return False
+        traces = self.style.get(stylename)["traces"]
+        return any(
+            traces[name].get("condition") == condition
+            and traces[name].get("class") == "Space"
+            for name in traces
+        )
+
+    def normal(self, coor, elevation):
+        """Corner normals at a trace node, these depend on neighbouring traces"""
+        key = coor_to_key([coor[0], coor[1], elevation])
+        return [
+            [round(float(value), 4) for value in self.normals[label][key]]
+            for label in sorted(self.normals)
+            if key in self.normals[label]
+        ]
+
+    def trace(self, stylename, condition, elevation, height, chain):
+        """Signature for a trace, a ugraph chain"""
+        if self.relative:
+            self.origin = trace_origin(chain)
+        items = [
+            condition,
+            el(elevation),
+            el(height),
+            self.elevations.get(elevation),
+            stylename,
+            self.stylename(stylename),
+        ]
+        separation = self.uses_separation(stylename, condition)
+        for node in chain.graph:
+            data = chain.graph[node][1]
+            start = data["start_vertex"].Coordinates()
+            end = data["end_vertex"].Coordinates()
+            items.append(
+                [
+                    geometry_key([start], self.origin),
+                    geometry_key([end], self.origin),
+                    self.normal(start, elevation),
+                    self.normal(end, elevation),
+                    self.face(data["face"]),
+                    self.cell(data["back_cell"], separation),
+                    self.cell(data["front_cell"], separation),
+                ]
+            )
+        return "trace/" + digest(items)
+
+    def hull(self, stylename, condition, hull):
+        """Signature for a hull, a ushell shell"""
+        if self.relative:
+            self.origin = hull_origin(hull)
+        items = [
+            condition,
+            sorted(self.elevations.items()),
+            stylename,
+            self.stylename(stylename),
+        ]
+        for facet in hull.faces:
+            data = facet[1]
+            items.append(
+                [
+                    [
+                        geometry_key([hull.coordinates[key]], self.origin)
+                        for key in facet[0]
+                    ],
+                    self.face(data["face"]),
+                    self.cell(data["back_cell"]),
+                    self.cell(data["front_cell"]),
+                ]
+            )
+        return "hull/" + digest(items)
+
+
+def match_faces(cellcomplex, faces):
+    """Given a dictionary of (coordinates, stylename) for old Face indices,
+    returns a dictionary of new Face indices for old Face indices"""
+    lookup = {}
+    faces_ptr = []
+    cellcomplex.Faces(None, faces_ptr)
+    for face in faces_ptr:
+        vertices, polygons = face.Mesh()
+        lookup[(geometry_key(vertices), face.Get("stylename"))] = str(face.Get("index"))
+    result = {}
+    for index, (coordinates, stylename) in faces.items():
+        key = (geometry_key(coordinates), stylename)
+        if key in lookup:
+            result[str(index)] = lookup[key]
+    return result
+
+
+def match_cells(cellcomplex, points):
+    """Given a dictionary of coordinates inside old Cells, indexed by old Cell
+    index, returns a dictionary of new Cell indices for old Cell indices"""
+    indices = list(points)
+    vertices = [Vertex.ByCoordinates(*points[index]) for index in indices]
+    # only test points with bounding boxes that overlap the cell
+    grid = topologist.grid.Grid(
+        [topologist.grid.bounding_box(vertex) for vertex in vertices]
+    )
+    result = {}
+    cells_ptr = []
+    cellcomplex.Cells(None, cells_ptr)
+    for cell in cells_ptr:
+        for item in grid.query(*topologist.grid.bounding_box(cell)):
+            if CellUtility.Contains(cell, vertices[item], 0.001) == 0:
+                result[str(indices[item])] = str(cell.Get("index"))
+    return result
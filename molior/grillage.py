@@ -1,7 +1,8 @@
+import copy
 import ifcopenshell.api
 import numpy
 
-from topologist.helpers import string_to_coor, el
+from topologist.helpers import el
 from topologic import Face, Vertex
 from molior.baseclass import BaseClass
 from molior.geometry import map_to_2d, add_2d, scale_2d, subtract_3d
@@ -73,7 +74,7 @@ class Grillage(BaseClass):
             else:
                 normal = subtract_3d([0.0, 0.0, 0.0], face[1]["face"].Normal())
 
-            vertices = [[*string_to_coor(node_str)] for node_str in face[0]]
+            vertices = [[*self.hull.coordinates[key]] for key in face[0]]
 
             # need this for boundaries
             nodes_2d, matrix, normal_x = map_to_2d(vertices, normal)
@@ -215,7 +216,7 @@ class Grillage(BaseClass):
                                 "style_families": self.style_families,
                                 "style_object": self.style_object,
                             }
-                            vals.update(config)
+                            vals.update(copy.deepcopy(config))
                             part = getattr(self, config["class"])(vals)
                             part.execute()
 
@@ -269,7 +270,7 @@ class Grillage(BaseClass):
                                 "style_families": self.style_families,
                                 "style_object": self.style_object,
                             }
-                            vals.update(config)
+                            vals.update(copy.deepcopy(config))
                             part = getattr(self, config["class"])(vals)
                             part.execute()
 
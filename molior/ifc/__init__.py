@@ -4,8 +4,12 @@ A collection of code for commonly used IFC related tasks
 
 """
 
+import weakref
+import numpy
 import ifcopenshell.api
+import ifcopenshell.guid
 import ifcopenshell.util.system
+import ifcopenshell.util.element
 from molior.geometry import (
     matrix_align,
     add_2d,
@@ -17,6 +21,18 @@ from molior.geometry import (
 
 run = ifcopenshell.api.run
 
+# Representation Context ids for each IFC file, see get_context_by_name()
+context_caches = weakref.WeakKeyDictionary()
+
+# Material, Project Library and Type Object ids for each IFC file, see get_asset_cache()
+asset_caches = weakref.WeakKeyDictionary()
+
+# Storey and Space ids by Name and CellIndex for each IFC file, see spatial_index()
+spatial_indexes = weakref.WeakKeyDictionary()
+
+# EPset_Topology values written for each IFC file, see get_topology_epsets()
+topology_epsets = weakref.WeakKeyDictionary()
+
 
 def init(name="Homemaker Project", file=None):
     """Creates and sets up an ifc 'file' object"""
@@ -108,13 +124,11 @@ def create_storeys(self, parent, elevations):
     if elevations == {}:
         elevations[0.0] = 0
     for elevation in sorted(elevations):
-        for storey in self.by_type("IfcBuildingStorey"):
-            if (
-                storey.Name == str(elevations[elevation])
-                and storey.Decomposes
-                and storey.Decomposes[0].RelatingObject == parent
-            ):
-                continue
+        # a regenerated building keeps its existing storeys
+        if get_spatial_byindex(
+            self, "IfcBuildingStorey", parent, elevations[elevation]
+        ):
+            continue
         mystorey = run(
             "root.create_entity",
             self,
@@ -125,6 +139,7 @@ def create_storeys(self, parent, elevations):
         mystorey.Description = "Storey " + mystorey.Name
         mystorey.LongName = mystorey.Description
         mystorey.CompositionType = "ELEMENT"
+        register_spatial(self, mystorey, mystorey.Name)
         run("aggregate.assign_object", self, product=mystorey, relating_object=parent)
         run(
             "geometry.edit_object_placement",
@@ -140,7 +155,42 @@ def get_context_by_name(
     context_identifier=None,
     target_view=None,
 ):
-    """Retrieve or create a Representation Context"""
+    """Retrieve or create a Representation Context, results are cached. Contexts
+    deleted by any means are forgotten when next looked up"""
+    if not self in context_caches:
+        context_caches[self] = {}
+    key = (parent_context_identifier, context_identifier, target_view)
+    context = cached_entity(self, context_caches[self], key)
+    if context == None:
+        context = find_or_create_context(
+            self,
+            parent_context_identifier=parent_context_identifier,
+            context_identifier=context_identifier,
+            target_view=target_view,
+        )
+        context_caches[self][key] = context.id()
+    return context
+
+
+def cached_entity(self, cache, key):
+    """Retrieve an entity from a dictionary of entity ids, or None. Ids of
+    entities that are no longer in the file are removed"""
+    if not key in cache:
+        return None
+    try:
+        return self.by_id(cache[key])
+    except RuntimeError:
+        del cache[key]
+        return None
+
+
+def find_or_create_context(
+    self,
+    parent_context_identifier=None,
+    context_identifier=None,
+    target_view=None,
+):
+    """Retrieve or create a Representation Context, without caching"""
     mycontext = get_context(
         self,
         parent_context_identifier,
@@ -239,10 +289,30 @@ def get_structural_analysis_model_by_name(self, spatial_element, name):
     return model
 
 
+def get_asset_cache(self):
+    """Lookup tables of Material ids by Name, Project Library ids by Name and
+    Type Object ids by (stylename, ifc_type, Name) for an IFC file, see
+    cached_entity(). Assets deleted by any means are forgotten when next looked up"""
+    if not self in asset_caches:
+        asset_caches[self] = {"materials": {}, "libraries": {}, "types": {}}
+    return asset_caches[self]
+
+
+def clear_asset_cache(self):
+    """Forget cached assets, necessary if any have been deleted"""
+    if self in asset_caches:
+        del asset_caches[self]
+
+
 def get_library_by_name(self, library_name):
     """Retrieve a Project Library by name, creating it if necessary"""
+    libraries = get_asset_cache(self)["libraries"]
+    library = cached_entity(self, libraries, library_name)
+    if library != None:
+        return library
     for library in self.by_type("IfcProjectLibrary"):
         if library.Name == library_name:
+            libraries[library_name] = library.id()
             return library
     library = run(
         "root.create_entity", self, ifc_class="IfcProjectLibrary", name=library_name
@@ -253,17 +323,20 @@ def get_library_by_name(self, library_name):
         definition=library,
         relating_context=self.by_type("IfcProject")[0],
     )
+    libraries[library_name] = library.id()
     return library
 
 
 def get_material_by_name(self, style_object, stylename="default", name="Error"):
     """Retrieve an IfcMaterial by name, creating it if necessary"""
-    materials = {}
-    for material in self.by_type("IfcMaterial"):
-        materials[material.Name] = material
-    if name in materials:
-        mymaterial = materials[name]
-    else:
+    materials = get_asset_cache(self)["materials"]
+    mymaterial = cached_entity(self, materials, name)
+    if mymaterial == None:
+        # materials may have arrived with other assets, look again
+        for material in self.by_type("IfcMaterial"):
+            materials[material.Name] = material.id()
+        mymaterial = cached_entity(self, materials, name)
+    if mymaterial == None:
         (found_stylename, library_file, element) = style_object.get_from_library(
             stylename, "IfcMaterial", name
         )
@@ -275,6 +348,7 @@ def get_material_by_name(self, style_object, stylename="default", name="Error"):
         else:
             # we need to create a new material
             mymaterial = run("material.add_material", self, name=name)
+        materials[name] = mymaterial.id()
     return mymaterial
 
 
@@ -304,6 +378,11 @@ def get_parent_building(entity):
         if not services:
             return None
         parent = services[0].RelatedBuildings[0]
+    elif entity.is_a("IfcGroup"):
+        assignments = entity.HasAssignments
+        if not assignments:
+            return None
+        parent = assignments[0].RelatingProduct
     else:
         return None
     if parent.is_a("IfcBuilding"):
@@ -415,10 +494,12 @@ def create_face_surface(self, polygon, normal):
 
 
 def create_tessellation_from_mesh(self, vertices, faces):
-    """Create a Tessellation from vertex coordinates and faces"""
-    pointlist = self.createIfcCartesianPointList3D(vertices)
+    """Create a Tessellation from vertex coordinates and faces, lists or NumPy arrays"""
+    pointlist = self.createIfcCartesianPointList3D(
+        numpy.asarray(vertices, dtype=float).tolist()
+    )
     indexedfaces = [
-        self.createIfcIndexedPolygonalFace([index + 1 for index in face])
+        self.createIfcIndexedPolygonalFace([int(index) + 1 for index in face])
         for face in faces
     ]
     return self.createIfcPolygonalFaceSet(pointlist, None, indexedfaces, None)
@@ -469,6 +550,17 @@ def add_pset(self, product, name, properties):
         pset=pset,
         properties=properties,
     )
+    if name == "EPset_Topology":
+        get_topology_epsets(self).setdefault(product, {}).update(properties)
+
+
+def get_topology_epsets(self):
+    """EPset_Topology values as they are written, a dictionary of entities and
+    their {FaceIndex, CellIndex, BackCellIndex etc..} properties. Avoids parsing
+    psets to find which topology an entity belongs to"""
+    if not self in topology_epsets:
+        topology_epsets[self] = {}
+    return topology_epsets[self]
 
 
 def add_face_topology_epsets(self, entity, face, back_cell, front_cell):
@@ -508,59 +600,116 @@ def add_cell_topology_epsets(self, entity, cell):
         cell_index = cell.Get("index")
         if cell_index != None:
             add_pset(self, entity, "EPset_Topology", {"CellIndex": cell_index})
+            if entity.is_a("IfcSpace"):
+                register_spatial(self, entity, cell_index)
         cell_usage = cell.Get("usage")
         if cell_usage != None:
             add_pset(self, entity, "EPset_Topology", {"Usage": cell_usage})
 
 
+def spatial_index(self):
+    """Lookup tables of Storey ids by Name and Space ids by EPset_Topology
+    CellIndex, built once for an IFC file and kept up to date as entities are
+    created. Entities deleted without unregister_spatial() are forgotten when
+    next looked up"""
+    if not self in spatial_indexes:
+        index = {"IfcBuildingStorey": {}, "IfcSpace": {}}
+        for storey in self.by_type("IfcBuildingStorey"):
+            index["IfcBuildingStorey"].setdefault(storey.Name, []).append(storey.id())
+        for space in self.by_type("IfcSpace"):
+            pset_topology = ifcopenshell.util.element.get_psets(space).get(
+                "EPset_Topology"
+            )
+            if pset_topology and "CellIndex" in pset_topology:
+                index["IfcSpace"].setdefault(
+                    str(pset_topology["CellIndex"]), []
+                ).append(space.id())
+        spatial_indexes[self] = index
+    return spatial_indexes[self]
+
+
+def register_spatial(self, entity, key):
+    """Add a new Storey or Space to the lookup tables, if they exist yet"""
+    if self in spatial_indexes:
+        spatial_indexes[self][entity.is_a()].setdefault(str(key), []).append(
+            entity.id()
+        )
+
+
+def unregister_spatial(self, entity):
+    """Remove a deleted Storey or Space from the lookup tables"""
+    if self in spatial_indexes and entity.is_a() in spatial_indexes[self]:
+        for entity_ids in spatial_indexes[self][entity.is_a()].values():
+            if entity.id() in entity_ids:
+                entity_ids.remove(entity.id())
+
+
+def get_spatial_byindex(self, ifc_class, building, index):
+    """Retrieve a Storey or Space in this Building by Name or CellIndex, or None"""
+    entity_ids = spatial_index(self)[ifc_class].get(str(index), [])
+    # the last one created wins
+    for entity_id in reversed(list(entity_ids)):
+        try:
+            entity = self.by_id(entity_id)
+        except RuntimeError:
+            # deleted by other means
+            entity_ids.remove(entity_id)
+            continue
+        if get_parent_building(entity) == building:
+            return entity
+    return None
+
+
+def get_spaces_byindex(self, building):
+    """All Spaces in this Building as a dictionary indexed by CellIndex"""
+    spaces = {}
+    for index in spatial_index(self)["IfcSpace"]:
+        space = get_spatial_byindex(self, "IfcSpace", building, index)
+        if space:
+            spaces[index] = space
+    return spaces
+
+
 def assign_storey_byindex(self, entity, building, index):
     """Assign object to a storey by index"""
-    storeys = {}
-    for storey in self.by_type("IfcBuildingStorey"):
-        if get_parent_building(storey) == building:
-            storeys[storey.Name] = storey
+    storey = get_spatial_byindex(self, "IfcBuildingStorey", building, index)
+    if storey == None:
+        raise KeyError(str(index))
     if entity.is_a("IfcSpatialElement"):
         run(
             "aggregate.assign_object",
             self,
             product=entity,
-            relating_object=storeys[str(index)],
+            relating_object=storey,
         )
     else:
         run(
             "spatial.assign_container",
             self,
             product=entity,
-            relating_structure=storeys[str(index)],
+            relating_structure=storey,
         )
-    return storeys[str(index)]
+    return storey
 
 
 def assign_space_byindex(self, entity, building, index):
     """Assign object to a Space by index"""
-    spaces = {}
-    for space in self.by_type("IfcSpace"):
-        if get_parent_building(space) == building:
-            pset_topology = ifcopenshell.util.element.get_psets(space).get(
-                "EPset_Topology"
-            )
-            if pset_topology:
-                spaces[pset_topology["CellIndex"]] = space
-    if not str(index) in spaces:
+    space = get_spatial_byindex(self, "IfcSpace", building, index)
+    if space == None:
         return
     if entity.is_a("IfcSpatialElement"):
         run(
             "aggregate.assign_object",
             self,
             product=entity,
-            relating_object=spaces[str(index)],
+            relating_object=space,
         )
     else:
         run(
             "spatial.assign_container",
             self,
             product=entity,
-            relating_structure=spaces[str(index)],
+            relating_structure=space,
         )
 
 
@@ -572,11 +721,17 @@ def get_type_object(
     name="error",
 ):
     """Fetch a Type Object locally, or from an external IFC library"""
+    types = get_asset_cache(self)["types"]
+    key = (stylename, ifc_type, name)
+    definition = cached_entity(self, types, key)
+    if definition != None:
+        return definition
     # let's see if there is an existing Type Product defined in the relevant library
     library = get_library_by_name(self, stylename)
     for declares in library.Declares:
         for definition in declares.RelatedDefinitions:
             if definition.is_a(ifc_type) and definition.Name == name:
+                types[key] = definition.id()
                 return definition
     # otherwise, load from IFC library file
     (found_stylename, library_file, element) = style_object.get_from_library(
@@ -599,8 +754,9 @@ def get_type_object(
         "project.assign_declaration",
         self,
         definition=definition,
-        relating_context=get_library_by_name(self, stylename),
+        relating_context=library,
     )
+    types[key] = definition.id()
     return definition
 
 
@@ -624,6 +780,10 @@ def delete_ifc_product(self, product):
         for child in product.ContainsElements:
             for child_product in child.RelatedElements:
                 delete_ifc_product(self, child_product)
+    if product.is_a("IfcBuilding"):
+        # Fragment Groups are assigned to the Building, see create_fragment()
+        for group in list(get_fragments(self, product).values()):
+            remove_fragment_group(self, group)
     if getattr(product, "FillsVoids", None):
         run("void.remove_filling", self, element=product)
     if product.is_a("IfcOpeningElement"):
@@ -639,93 +799,533 @@ def delete_ifc_product(self, product):
                 run("void.remove_filling", self, element=rel.RelatedOpeningElement)
         for port in ifcopenshell.util.system.get_ports(product):
             run("root.remove_product", self, product=port)
+    unregister_spatial(self, product)
     run("root.remove_product", self, product=product)
 
 
+def get_id_marker(self):
+    """An id greater than any existing entity and less than any entity created later"""
+    marker = self.createIfcDirection([0.0, 0.0, 1.0])
+    marker_id = marker.id()
+    self.remove(marker)
+    return marker_id
+
+
+def create_fragment(self, building, name, products):
+    """Group the products generated from a single trace or hull, see molior.fragment"""
+    group = run("root.create_entity", self, ifc_class="IfcGroup", name=name)
+    group.ObjectType = "Fragment"
+    rel_product = run("root.create_entity", self, ifc_class="IfcRelAssignsToProduct")
+    rel_product.RelatedObjects = [group]
+    rel_product.RelatingProduct = building
+    if products:
+        rel_group = run("root.create_entity", self, ifc_class="IfcRelAssignsToGroup")
+        rel_group.RelatedObjects = products
+        rel_group.RelatingGroup = group
+    return group
+
+
+def get_fragments(self, building):
+    """Fragment Groups in this Building as a dictionary indexed by Name"""
+    fragments = {}
+    for group in self.by_type("IfcGroup"):
+        if group.ObjectType == "Fragment" and get_parent_building(group) == building:
+            fragments[group.Name] = group
+    return fragments
+
+
+def get_fragment_products(group):
+    """Products in a Fragment Group"""
+    return [product for rel in group.IsGroupedBy for product in rel.RelatedObjects]
+
+
+def delete_fragment(self, group):
+    """Delete a Fragment Group and all the products in it"""
+    product_ids = sorted([product.id() for product in get_fragment_products(group)])
+    remove_fragment_group(self, group)
+    delete_products(self, product_ids)
+
+
+def remove_fragment_group(self, group):
+    """Remove a Fragment Group and its relationships, but not its products"""
+    for rel in list(group.IsGroupedBy) + list(group.HasAssignments):
+        self.remove(rel)
+    run("root.remove_product", self, product=group)
+
+
+def delete_products(self, product_ids):
+    """Delete products given a list of ids"""
+    # children are deleted along with parents, so products are tracked by id
+    for product_id in sorted(product_ids):
+        try:
+            product = self.by_id(product_id)
+        except RuntimeError:
+            continue
+        if product.is_a("IfcSpace"):
+            release_contained_elements(self, product)
+        delete_ifc_product(self, product)
+
+
+def release_contained_elements(self, space):
+    """Move elements contained in a Space up to the parent Storey, so they
+    aren't deleted along with the Space"""
+    if not space.Decomposes:
+        return
+    parent = space.Decomposes[0].RelatingObject
+    elements = [
+        element for rel in space.ContainsElements for element in rel.RelatedElements
+    ]
+    for element in elements:
+        run(
+            "spatial.assign_container",
+            self,
+            product=element,
+            relating_structure=parent,
+        )
+
+
+def remap_topology_epsets(self, products, face_map, cell_map, check_only=False):
+    """Renumber the EPset_Topology indices and Space Boundaries of existing
+    products, given dictionaries of new indices for old indices. Returns False,
+    changing nothing, if any index has no new equivalent"""
+    maps = {
+        "FaceIndex": face_map,
+        "CellIndex": cell_map,
+        "BackCellIndex": cell_map,
+        "FrontCellIndex": cell_map,
+        "FaceIndices": face_map,
+    }
+    edits = []
+    for product in products:
+        pset_topology = ifcopenshell.util.element.get_psets(product).get(
+            "EPset_Topology"
+        )
+        if pset_topology:
+            properties = {}
+            for key, value in pset_topology.items():
+                if key == "id":
+                    continue
+                if key in maps:
+                    indices = [maps[key].get(index) for index in str(value).split()]
+                    if None in indices:
+                        return False
+                    value = " ".join(indices)
+                properties[key] = value
+            edits.append([product, self.by_id(pset_topology["id"]), properties])
+        for boundary in getattr(product, "ProvidesBoundaries", None) or []:
+            properties = {}
+            for attribute, mymap in [["Name", face_map], ["Description", cell_map]]:
+                items = (getattr(boundary, attribute) or "").split()
+                if len(items) == 2 and items[0] in maps:
+                    if not items[1] in mymap:
+                        return False
+                    properties[attribute] = items[0] + " " + mymap[items[1]]
+            edits.append([boundary, None, properties])
+    if check_only:
+        return True
+
+    for entity, pset, properties in edits:
+        if pset == None:
+            for attribute, value in properties.items():
+                setattr(entity, attribute, value)
+            continue
+        run("pset.edit_pset", self, pset=pset, properties=properties)
+        get_topology_epsets(self)[entity] = properties
+        # spaces are indexed by CellIndex
+        if entity.is_a("IfcSpace") and "CellIndex" in properties:
+            unregister_spatial(self, entity)
+            register_spatial(self, entity, properties["CellIndex"])
+    return True
+
+
+# entity classes that copies of products share rather than duplicate
+SHARED = [
+    "IfcOwnerHistory",
+    "IfcRepresentationContext",
+    "IfcRepresentationMap",
+    "IfcPresentationStyle",
+    "IfcMaterialDefinition",
+    "IfcNamedUnit",
+    "IfcProfileDef",
+]
+
+# relationships that are not copied along with products
+UNCOPIED = [
+    "IfcRelConnectsStructuralMember",
+    "IfcRelConnectsStructuralActivity",
+]
+
+
+def copy_products(self, products, offset):
+    """Duplicate products along with their representations, psets and
+    relationships, moved horizontally by an [x, y, 0.0] offset. Returns the
+    copies in the same order"""
+    owned = set([product.id() for product in products])
+    for product in products:
+        if product.ObjectPlacement:
+            owned.add(product.ObjectPlacement.id())
+    copies = {}
+    result = [copy_entity(self, product, copies, owned) for product in products]
+    copy_styled_items(self, self, copies, owned)
+
+    rels = {}
+    for product in products:
+        for rel in self.get_inverse(product):
+            if rel.is_a("IfcRelationship"):
+                rels[rel.id()] = rel
+    fresh = set([product.id() for product in products])
+    for rel_id in sorted(rels):
+        copy_relationship(self, rels[rel_id], copies, owned, fresh)
+
+    # geometry of structural items and space boundaries is not relative to a placement
+    copied = set([duplicate.id() for duplicate in copies.values()])
+    moved = set()
+    for product in result:
+        placement = product.ObjectPlacement
+        if product.is_a("IfcStructuralItem"):
+            translate_points(product.Representation, offset, copied, moved)
+        elif placement and not (
+            placement.PlacementRelTo and placement.PlacementRelTo.id() in owned
+        ):
+            translate_points(placement.RelativePlacement, offset, copied, moved)
+        for boundary in getattr(product, "ProvidesBoundaries", None) or []:
+            translate_points(boundary.ConnectionGeometry, offset, copied, moved)
+    return result
+
+
+def is_owned(entity, owned):
+    """Is an entity copied along with products, or shared with the copies"""
+    if owned == None:
+        return True
+    if entity.id() in owned:
+        return True
+    for ifc_class in ["IfcObjectDefinition", "IfcObjectPlacement"] + SHARED:
+        if entity.is_a(ifc_class):
+            return False
+    return True
+
+
+def copy_entity(self, entity, copies, owned):
+    """Copy an entity and the owned entities it refers to"""
+    if entity.id() in copies:
+        return copies[entity.id()]
+    if not is_owned(entity, owned):
+        return entity
+    values = [
+        copy_value(self, value, copies, owned) for value in attribute_values(entity)
+    ]
+    duplicate = self.create_entity(entity.is_a(), *values)
+    if duplicate.is_a("IfcRoot"):
+        duplicate.GlobalId = ifcopenshell.guid.new()
+    copies[entity.id()] = duplicate
+    return duplicate
+
+
+def copy_styled_items(self, source, copies, owned):
+    """Copy the Styled Items of copied representation items in a source file,
+    nothing refers to a Styled Item so these are not copied with the items"""
+    for entity_id in sorted(copies):
+        entity = source.by_id(entity_id)
+        if not entity.is_a("IfcRepresentationItem"):
+            continue
+        for styled_item in entity.StyledByItem or []:
+            copy_entity(self, styled_item, copies, owned)
+
+
+def copy_value(self, value, copies, owned):
+    """Copy an attribute value, which may be an entity or a nested list"""
+    if isinstance(value, ifcopenshell.entity_instance):
+        if value.id():
+            return copy_entity(self, value, copies, owned)
+        # simple typed values have no id, but may belong to another file
+        return self.create_entity(value.is_a(), value.wrappedValue)
+    elif isinstance(value, (list, tuple)):
+        return [copy_value(self, item, copies, owned) for item in value]
+    return value
+
+
+def copy_relationship(self, rel, copies, owned, fresh):
+    """Copy a relationship between copied objects, or between copied objects
+    and shared entities such as Storeys and Type Objects. fresh is the set of
+    ids of objects being copied, relationships without any are skipped"""
+    for ifc_class in UNCOPIED:
+        if rel.is_a(ifc_class):
+            return None
+    # copies are grouped into their own Fragment
+    if (
+        rel.is_a("IfcRelAssignsToGroup")
+        and rel.RelatingGroup.ObjectType == "Fragment"
+        and not rel.RelatingGroup.id() in fresh
+    ):
+        return None
+    related = False
+    values = []
+    for value in attribute_values(rel):
+        if isinstance(value, (list, tuple)) and [
+            item
+            for item in value
+            if isinstance(item, ifcopenshell.entity_instance)
+            and item.is_a("IfcObjectDefinition")
+        ]:
+            value = [
+                copy_entity(self, item, copies, owned)
+                for item in value
+                if item.id() in fresh
+            ]
+            if not value:
+                return None
+            related = True
+        else:
+            if isinstance(value, ifcopenshell.entity_instance) and value.id() in fresh:
+                related = True
+            value = copy_value(self, value, copies, owned)
+        values.append(value)
+    if not related:
+        return None
+    duplicate = self.create_entity(rel.is_a(), *values)
+    duplicate.GlobalId = ifcopenshell.guid.new()
+    return duplicate
+
+
+def merge_file(self, other, building):
+    """Copy everything in another IFC file into a Building in this file. The
+    Project, Spatial Elements, Structural Analysis Model, Contexts, Type Objects,
+    Materials and Styles of the other file are replaced by any equivalents here"""
+    copies = map_shared(self, other, building)
+    definitions = [
+        definition
+        for definition in other.by_type("IfcObjectDefinition")
+        if not definition.id() in copies
+    ]
+    fresh = set([definition.id() for definition in definitions])
+    for definition in definitions:
+        copy_entity(self, definition, copies, None)
+    # styles are mapped to equivalents in this file by map_shared()
+    copy_styled_items(self, other, copies, None)
+    for rel in other.by_type("IfcRelationship"):
+        copy_relationship(self, rel, copies, None, fresh)
+
+    # keep lookup tables up to date
+    table = get_topology_epsets(self)
+    for definition in definitions:
+        pset_topology = ifcopenshell.util.element.get_psets(definition).get(
+            "EPset_Topology"
+        )
+        if pset_topology:
+            table[copies[definition.id()]] = {
+                key: value for key, value in pset_topology.items() if key != "id"
+            }
+    spatial_indexes.pop(self, None)
+    clear_asset_cache(self)
+    return [copies[definition.id()] for definition in definitions]
+
+
+def map_shared(self, other, building):
+    """Entities in another file with equivalents in this file, as a dictionary
+    of entities in this file indexed by id in the other file"""
+    mapped = {}
+    project = self.by_type("IfcProject")[0]
+    for other_project in other.by_type("IfcProject"):
+        mapped[other_project.id()] = project
+    owner_histories = self.by_type("IfcOwnerHistory")
+    if owner_histories:
+        for owner_history in other.by_type("IfcOwnerHistory"):
+            mapped[owner_history.id()] = owner_histories[0]
+
+    for other_building in other.by_type("IfcBuilding"):
+        if other_building.Name == building.Name:
+            mapped[other_building.id()] = building
+            if other_building.Decomposes and building.Decomposes:
+                other_site = other_building.Decomposes[0].RelatingObject
+                mapped[other_site.id()] = building.Decomposes[0].RelatingObject
+    for other_storey in other.by_type("IfcBuildingStorey"):
+        storey = get_spatial_byindex(
+            self, "IfcBuildingStorey", building, other_storey.Name
+        )
+        if storey:
+            mapped[other_storey.id()] = storey
+    for other_model in other.by_type("IfcStructuralAnalysisModel"):
+        mapped[other_model.id()] = get_structural_analysis_model_by_name(
+            self, building, other_model.Name[len("Structure/") :]
+        )
+    # products placed relative to spatial elements share their placements
+    for other_id, entity in list(mapped.items()):
+        other_placement = getattr(other.by_id(other_id), "ObjectPlacement", None)
+        if other_placement and getattr(entity, "ObjectPlacement", None):
+            mapped[other_placement.id()] = entity.ObjectPlacement
+
+    for ifc_class, key in [
+        ["IfcGeometricRepresentationContext", context_key],
+        ["IfcTypeObject", type_key],
+        ["IfcProjectLibrary", lambda entity: entity.Name],
+        ["IfcMaterial", lambda entity: entity.Name],
+        ["IfcMaterialLayerSet", lambda entity: entity.LayerSetName],
+        ["IfcMaterialProfileSet", lambda entity: entity.Name],
+        ["IfcPresentationStyle", lambda entity: entity.Name],
+    ]:
+        lookup = {}
+        for entity in self.by_type(ifc_class):
+            lookup.setdefault(key(entity), entity)
+        for entity in other.by_type(ifc_class):
+            if key(entity) in lookup:
+                mapped[entity.id()] = lookup[key(entity)]
+    return mapped
+
+
+def context_key(context):
+    """Representation Contexts are equivalent if they have the same identifiers"""
+    parent = getattr(context, "ParentContext", None)
+    return (
+        context.is_a(),
+        context.ContextType,
+        context.ContextIdentifier,
+        getattr(context, "TargetView", None),
+        parent and parent.ContextType,
+        parent and parent.ContextIdentifier,
+    )
+
+
+def type_key(type_object):
+    """Type Objects are equivalent if they have the same class, name and library"""
+    libraries = [
+        rel.RelatingContext.Name
+        for rel in getattr(type_object, "HasContext", None) or []
+    ]
+    return (type_object.is_a(), type_object.Name, tuple(libraries))
+
+
+def translate_points(entity, offset, copied, moved):
+    """Move all copied 3D points referred to by a copied entity, given sets of
+    copied and already moved entity ids"""
+    if not isinstance(entity, ifcopenshell.entity_instance):
+        return
+    if not entity.id() in copied or entity.id() in moved:
+        return
+    moved.add(entity.id())
+    if entity.is_a("IfcCartesianPoint"):
+        coordinates = entity.Coordinates
+        if len(coordinates) == 3:
+            entity.Coordinates = [coordinates[axis] + offset[axis] for axis in range(3)]
+        return
+    for item in entity_references(attribute_values(entity)):
+        translate_points(item, offset, copied, moved)
+
+
+# entity classes that are deleted when nothing refers to them
+PURGEABLE = [
+    "IfcConnectionGeometry",
+    "IfcBoundaryCondition",
+    "IfcPresentationItem",
+    "IfcProfileDef",
+    "IfcRepresentation",
+    "IfcGeometricRepresentationItem",
+    "IfcMaterialDefinition",
+    "IfcLocalPlacement",
+]
+
+
 def purge_unused(self):
-    """Delete some unused entities"""
-    todo = True
-    while todo:
-        todo = False
-        for type_object in self.by_type("IfcTypeObject"):
-            if not type_object.Types or not type_object.Types[0].RelatedObjects:
-                # need this or it segfaults IfcOpenShell/IfcOpenShell#2697
-                run("material.unassign_material", self, product=type_object)
-                delete_ifc_product(self, type_object)
-                todo = True
-        for pset in self.by_type("IfcPropertySet"):
-            if (
-                not pset.DefinesType
-                and not pset.IsDefinedBy
-                and not pset.DefinesOccurrence
-            ):
-                delete_ifc_product(self, pset)
-                todo = True
-        for rep in self.by_type("IfcMaterialDefinitionRepresentation"):
-            if not rep.RepresentedMaterial:
-                run("root.remove_product", self, product=rep)
-                todo = True
-        for ext in self.by_type("IfcExtendedProperties"):
-            if not ext.Properties:
-                run("root.remove_product", self, product=ext)
-                todo = True
-        for placement in self.by_type("IfcLocalPlacement"):
-            if not placement.PlacesObject and not placement.ReferencedByPlacements:
-                rel = placement.RelativePlacement
-                self.remove(rel.Location)
-                self.remove(rel.RefDirection)
-                if getattr(rel, "Axis", None):
-                    self.remove(rel.Axis)
-                self.remove(rel)
-                run("root.remove_product", self, product=placement)
-                todo = True
-        for entity in self.by_type("IfcConnectionGeometry"):
-            if not self.get_inverse(entity):
-                run("root.remove_product", self, product=entity)
-                todo = True
-        for entity in self.by_type("IfcBoundaryCondition"):
-            if not self.get_inverse(entity):
-                run("root.remove_product", self, product=entity)
-                todo = True
-        for entity in self.by_type("IfcPresentationItem"):
-            if not self.get_inverse(entity):
-                run("root.remove_product", self, product=entity)
-                todo = True
-        for entity in self.by_type("IfcProfileDef"):
-            if not self.get_inverse(entity):
-                run("root.remove_product", self, product=entity)
-                todo = True
-        for entity in self.by_type("IfcRepresentation"):
-            if not self.get_inverse(entity):
-                run("root.remove_product", self, product=entity)
-                todo = True
-        for entity in self.by_type("IfcGeometricRepresentationItem"):
-            if not self.get_inverse(entity):
-                run("root.remove_product", self, product=entity)
-                todo = True
-        for entity in self.by_type("IfcMaterialDefinition"):
-            if not self.get_inverse(entity):
-                run("root.remove_product", self, product=entity)
-                todo = True
-
-        # these are clearing up invalid results of root.remove_product
-        for rel in self.by_type("IfcRelConnectsStructuralMember"):
-            if not rel.RelatingStructuralMember:
-                run("root.remove_product", self, product=rel)
-                todo = True
-        for rel in self.by_type("IfcRelAssignsToProduct"):
-            if not rel.RelatingProduct:
-                run("root.remove_product", self, product=rel)
-                todo = True
-        for rel in self.by_type("IfcRelServicesBuildings"):
-            if not rel.RelatingSystem:
+    """Delete some unused entities, returns a count of deleted entities by class"""
+    # cached materials and type objects may be deleted
+    clear_asset_cache(self)
+    removed = {}
+
+    # products and relationships are deleted via the API, in dependency order
+    for type_object in self.by_type("IfcTypeObject"):
+        if not type_object.Types or not type_object.Types[0].RelatedObjects:
+            # need this or it segfaults IfcOpenShell/IfcOpenShell#2697
+            run("material.unassign_material", self, product=type_object)
+            tally(removed, type_object)
+            delete_ifc_product(self, type_object)
+    for pset in self.by_type("IfcPropertySet"):
+        if not pset.DefinesType and not pset.IsDefinedBy and not pset.DefinesOccurrence:
+            tally(removed, pset)
+            delete_ifc_product(self, pset)
+
+    # these are clearing up invalid results of root.remove_product
+    for ifc_class, attribute in [
+        ["IfcRelConnectsStructuralMember", "RelatingStructuralMember"],
+        ["IfcRelAssignsToProduct", "RelatingProduct"],
+        ["IfcRelServicesBuildings", "RelatingSystem"],
+        ["IfcRelAssignsToGroup", "RelatingGroup"],
+        ["IfcRelDeclares", "RelatedDefinitions"],
+    ]:
+        for rel in self.by_type(ifc_class):
+            if not getattr(rel, attribute):
+                tally(removed, rel)
                 run("root.remove_product", self, product=rel)
-                todo = True
-        for rel in self.by_type("IfcRelAssignsToGroup"):
-            if not rel.RelatingGroup:
-                run("root.remove_product", self, product=rel)
-                todo = True
-        for rel in self.by_type("IfcRelDeclares"):
-            if not rel.RelatedDefinitions:
-                run("root.remove_product", self, product=rel)
-                todo = True
+
+    # everything else is reference counted, counts are collected in one pass and
+    # decremented as entities are deleted, so each entity is only visited again
+    # when something that referred to it is deleted
+    counts = inverse_counts(self)
+    todo = []
+    for ifc_class in PURGEABLE + [
+        "IfcMaterialDefinitionRepresentation",
+        "IfcExtendedProperties",
+    ]:
+        todo.extend([entity.id() for entity in self.by_type(ifc_class)])
+    # entities are tracked by id, wrappers of deleted entities are invalid
+    deleted = set()
+    while todo:
+        entity_id = todo.pop()
+        if entity_id in deleted:
+            continue
+        entity = self.by_id(entity_id)
+        if not is_unused(entity, counts):
+            continue
+        referenced = [
+            reference.id() for reference in entity_references(attribute_values(entity))
+        ]
+        deleted.add(entity_id)
+        tally(removed, entity)
+        self.remove(entity)
+        for reference_id in referenced:
+            counts[reference_id] -= 1
+            if counts[reference_id] == 0:
+                todo.append(reference_id)
+    return removed
+
+
+def inverse_counts(self):
+    """How many times each entity is referred to by other entities, by id"""
+    counts = {}
+    for entity in self:
+        for reference in entity_references(attribute_values(entity)):
+            counts[reference.id()] = counts.get(reference.id(), 0) + 1
+    return counts
+
+
+def attribute_values(entity):
+    """All the attribute values of an entity as a list"""
+    return [entity[index] for index in range(len(entity))]
+
+
+def entity_references(values):
+    """Entities referred to by a list of attribute values, including nested lists"""
+    for value in values:
+        if isinstance(value, ifcopenshell.entity_instance):
+            # simple typed values have no id
+            if value.id():
+                yield value
+        elif isinstance(value, (list, tuple)):
+            yield from entity_references(value)
+
+
+def is_unused(entity, counts):
+    """Can this entity be deleted"""
+    if entity.is_a("IfcMaterialDefinitionRepresentation"):
+        return not entity.RepresentedMaterial
+    if entity.is_a("IfcExtendedProperties"):
+        return not entity.Properties
+    if counts.get(entity.id(), 0) > 0:
+        return False
+    for ifc_class in PURGEABLE:
+        if entity.is_a(ifc_class):
+            return True
+    return False
+
+
+def tally(removed, entity):
+    """Count deleted entities by class"""
+    removed[entity.is_a()] = removed.get(entity.is_a(), 0) + 1
@@ -1,3 +1,4 @@
+import copy
 import ifcopenshell.api
 import numpy
 
@@ -178,7 +179,7 @@ class Repeat(TraceClass):
                                     "style_families": self.style_families,
                                     "style_object": self.style_object,
                                 }
-                                vals.update(config)
+                                vals.update(copy.deepcopy(config))
                                 part = getattr(self, config["class"])(vals)
 
                                 part.execute()
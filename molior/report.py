@@ -0,0 +1,181 @@
+"""Instrumentation for the Molior pipeline
+
+A Report records wall time, IFC entities created and Topologic query cache
+statistics for each stage, running totals for each class of building part
+(Wall, Floor, Grillage etc.) and hit/miss counters for fragment reuse.
+
+Instrumentation is switched off unless a Report is passed to Molior, without
+one measure() returns a shared do-nothing context manager.
+
+"""
+
+import json
+import time
+import contextlib
+from molior.ifc import get_id_marker
+
+# returned by measure() when there is no Report
+disabled = contextlib.nullcontext()
+
+
+def measure(report, name, file=None, topology=None):
+    """Context manager timing a stage, does nothing if report is None"""
+    if report == None:
+        return disabled
+    return report.stage(name, file=file, topology=topology)
+
+
+def measure_part(report, classname, file=None):
+    """Context manager timing a building part, does nothing if report is None"""
+    if report == None:
+        return disabled
+    return report.part(classname, file=file)
+
+
+def cache_counts(topology):
+    """Hits and misses of the query Cache owned by a Topology"""
+    if topology == None:
+        return [0, 0]
+    info = topology.CacheInfo()
+    return [info["hits"], info["misses"]]
+
+
+class Report:
+    """Timings and counters collected while building, optionally each stage is
+    appended to a JSON lines log file as it completes"""
+
+    def __init__(self, log=None):
+        self.log = log
+        self.stages = {}
+        self.parts = {}
+        self.counters = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, file=None, topology=None):
+        """Record seconds, entities created and Topology cache hits for a stage"""
+        start_id = 0
+        if file != None:
+            start_id = get_id_marker(file)
+        start_cache = cache_counts(topology)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            entities = 0
+            if file != None:
+                # the marker entities themselves use one id
+                entities = get_id_marker(file) - start_id - 1
+            end_cache = cache_counts(topology)
+            if end_cache[0] < start_cache[0] or end_cache[1] < start_cache[1]:
+                # the cache was cleared during this stage
+                start_cache = [0, 0]
+            record = self.stages.setdefault(
+                name,
+                {"calls": 0, "seconds": 0.0, "entities": 0, "hits": 0, "misses": 0},
+            )
+            record["calls"] += 1
+            record["seconds"] += seconds
+            record["entities"] += entities
+            record["hits"] += end_cache[0] - start_cache[0]
+            record["misses"] += end_cache[1] - start_cache[1]
+            self.write_log(
+                {
+                    "stage": name,
+                    "seconds": seconds,
+                    "entities": entities,
+                    "hits": end_cache[0] - start_cache[0],
+                    "misses": end_cache[1] - start_cache[1],
+                }
+            )
+
+    @contextlib.contextmanager
+    def part(self, classname, file=None):
+        """Add the seconds and entities created by a building part to the
+        totals for its class"""
+        start_id = 0
+        if file != None:
+            start_id = get_id_marker(file)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            entities = 0
+            if file != None:
+                entities = get_id_marker(file) - start_id - 1
+            self.add_part(classname, 1, seconds, entities)
+
+    def add_part(self, classname, count, seconds, entities):
+        """Add to the totals for a class of building part"""
+        record = self.parts.setdefault(
+            classname, {"count": 0, "seconds": 0.0, "entities": 0}
+        )
+        record["count"] += count
+        record["seconds"] += seconds
+        record["entities"] += entities
+
+    def count(self, name, hit=True, number=1):
+        """Count hits or misses, e.g. a fragment copied instead of built"""
+        record = self.counters.setdefault(name, {"hits": 0, "misses": 0})
+        if hit:
+            record["hits"] += number
+        else:
+            record["misses"] += number
+
+    def merge(self, parts, counters):
+        """Add part totals and counters collected elsewhere, e.g. in a worker process"""
+        for classname, record in parts.items():
+            self.add_part(
+                classname, record["count"], record["seconds"], record["entities"]
+            )
+        for name, record in counters.items():
+            mine = self.counters.setdefault(name, {"hits": 0, "misses": 0})
+            mine["hits"] += record["hits"]
+            mine["misses"] += record["misses"]
+
+    def hit_rates(self):
+        """Fraction of hits for each stage and counter, None if never used"""
+        result = {}
+        for name, record in list(self.stages.items()) + list(self.counters.items()):
+            total = record["hits"] + record["misses"]
+            result[name] = None
+            if total:
+                result[name] = record["hits"] / total
+        return result
+
+    def as_dict(self):
+        """Everything recorded, as a dictionary suitable for JSON"""
+        return {
+            "stages": self.stages,
+            "parts": self.parts,
+            "counters": self.counters,
+            "hit_rates": self.hit_rates(),
+            "total": sum(record["seconds"] for record in self.stages.values()),
+        }
+
+    def write(self, path):
+        """Save the report as a JSON file"""
+        with open(path, "w") as output:
+            json.dump(self.as_dict(), output, indent=2)
+
+    def write_log(self, record):
+        """Append a record to the JSON lines log, if any"""
+        if self.log == None:
+            return
+        with open(self.log, "a") as output:
+            output.write(json.dumps(record) + "\n")
+
+    def summary(self):
+        """A plain text table of stages and parts"""
+        lines = []
+        for heading, table in [["stage", self.stages], ["part", self.parts]]:
+            lines.append("%-24s %10s %10s" % (heading, "seconds", "entities"))
+            for name, record in table.items():
+                lines.append(
+                    "%-24s %10.3f %10d" % (name, record["seconds"], record["entities"])
+                )
+        for name, rate in self.hit_rates().items():
+            if rate != None:
+                lines.append("%-24s %9.1f%% hits" % (name, rate * 100.0))
+        return "\n".join(lines)
@@ -1,6 +1,6 @@
 import ifcopenshell.api
 
-from topologist.helpers import string_to_coor, el
+from topologist.helpers import el
 from molior.baseclass import BaseClass
 from molior.geometry import map_to_2d, map_to_2d_simple, matrix_align
 from molior.ifc import (
@@ -61,7 +61,7 @@ class Shell(BaseClass):
 
         elevation = None
         for face in self.hull.faces:
-            vertices = [[*string_to_coor(node_str)] for node_str in face[0]]
+            vertices = [[*self.hull.coordinates[key]] for key in face[0]]
             normal = face[1]["face"].Normal()
             # need this for structure
             face_surface = create_face_surface(self.file, vertices, normal)
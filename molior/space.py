@@ -89,10 +89,8 @@ class Space(TraceClass):
         faces_ptr = []
         cell.FacesInclined(faces_ptr)
         if len(faces_ptr) > 0:
-            vertices, faces = cell.Mesh()
-            vertices = [
-                [v[0], v[1], v[2] - self.elevation - self.floor] for v in vertices
-            ]
+            vertices, faces = cell.MeshArrays()
+            vertices[:, 2] -= self.elevation + self.floor
             tessellation = create_tessellation_from_mesh(self.file, vertices, faces)
             representation = self.file.createIfcBooleanResult(
                 "INTERSECTION", representation, tessellation
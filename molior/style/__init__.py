@@ -17,9 +17,12 @@ folder tree, all others will be ignored.
 
 """
 
-import os, yaml, copy, json
+import os, yaml, copy, json, pickle, hashlib
 import ifcopenshell
 
+# Style objects already loaded in this process, keyed by absolute share_dir
+registry = {}
+
 
 class Style:
     """Inheritable style definitions and resources"""
@@ -32,17 +35,19 @@ class Style:
         if args is None:
             args = {}
         self.share_dir = "share"
-        self.data = {"default": {"ancestors": [], "traces": {}, "hulls": {}}}
-        self.files = {}
-        self.libraries = {}
         for arg in args:
             self.__dict__[arg] = args[arg]
 
-        if not os.path.isabs(self.share_dir):
-            self.share_dir = os.path.abspath(
-                os.path.join(os.path.dirname(__file__), "..", "..", self.share_dir)
-            )
-        self.share_dir = os.path.normpath(self.share_dir)
+        self.load()
+
+    def load(self):
+        """Read all the YAML and JSON data in share_dir, forgets any flattened styles"""
+        self.data = {"default": {"ancestors": [], "traces": {}, "hulls": {}}}
+        self.files = {}
+        self.libraries = {}
+        self.flattened = {}
+        self.share_dir = absolute_share_dir(self.share_dir)
+        self.loaded_dir = self.share_dir
         # share_dir should now be an absolute path
         # slurp all the yaml data under share_dir
         for root, dirs, files in os.walk(self.share_dir):
@@ -79,23 +84,35 @@ class Style:
                     self.libraries[stylename][prefix] = {
                         "path": os.path.join(root, name),
                         "file": None,
+                        "index": {},
                     }
                 else:
                     self.files[stylename][name] = os.path.join(root, name)
 
     def get(self, stylename):
-        """retrieves a flattened style definition with ancestors filling in the gaps"""
+        """retrieves a flattened style definition with ancestors filling in the gaps.
+        The result is calculated once and shared, it is read-only all the way down:
+        copy.deepcopy() returns ordinary dictionaries and lists that can be modified"""
         # FIXME this results in duplicated assets when an ancestor style is also in use
+        if not self.share_dir == self.loaded_dir:
+            self.load()
         if not stylename in self.data:
-            return self.get("default")
-        mydata = copy.deepcopy(self.data[stylename])
+            stylename = "default"
+        if not stylename in self.flattened:
+            self.flattened[stylename] = freeze(self.flatten(stylename))
+        return self.flattened[stylename]
+
+    def flatten(self, stylename):
+        """merge a style definition with its already flattened ancestor"""
+        mydata = self.data[stylename]
         if len(mydata["ancestors"]) == 0:
-            return mydata
-        ancestor = self.get(mydata["ancestors"][0])
+            return copy.deepcopy(mydata)
+        # deep copies of the frozen ancestor are mutable
+        ancestor = copy.deepcopy(self.get(mydata["ancestors"][0]))
         for key in ancestor:
             if not key == "ancestors":
                 if key in mydata:
-                    ancestor[key].update(mydata[key])
+                    ancestor[key].update(copy.deepcopy(mydata[key]))
         return ancestor
 
     def get_from_library(self, stylename, ifc_class, name):
@@ -106,12 +123,9 @@ class Style:
         # look in all IFC files in this folder
         for prefix in self.libraries[stylename]:
             library = self.libraries[stylename][prefix]
-            # load and cache ifc libraries if not loaded
-            if library["file"] == None:
-                library["file"] = ifcopenshell.open(library["path"])
-            for item in library["file"].by_type(ifc_class):
-                if item.Name == name:
-                    return (stylename, library["file"], item)
+            item = library_lookup(library, ifc_class, name)
+            if not item == None:
+                return (stylename, library["file"], item)
 
         if len(self.data[stylename]["ancestors"]) == 0:
             return (None, None, None)
@@ -120,3 +134,155 @@ class Style:
         return self.get_from_library(
             self.data[stylename]["ancestors"][0], ifc_class, name
         )
+
+
+class FrozenDict(dict):
+    """A read-only dictionary, deep copies are ordinary dictionaries"""
+
+    def readonly(self, *args, **kwargs):
+        raise TypeError("style data is read-only, copy before modifying")
+
+    __setitem__ = __delitem__ = __ior__ = readonly
+    clear = pop = popitem = setdefault = update = readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+
+class FrozenList(list):
+    """A read-only list, deep copies are ordinary lists"""
+
+    def readonly(self, *args, **kwargs):
+        raise TypeError("style data is read-only, copy before modifying")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = readonly
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(value, memo) for value in self]
+
+
+def freeze(value):
+    """A read-only version of nested dictionaries and lists"""
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return FrozenList([freeze(item) for item in value])
+    return value
+
+
+def library_lookup(library, ifc_class, name):
+    """Find an entity by class and Name in a library, or None. The library is
+    loaded and each class is indexed by Name the first time it is needed"""
+    if library["file"] == None:
+        library["file"] = ifcopenshell.open(library["path"])
+    if not ifc_class in library["index"]:
+        index = {}
+        for item in library["file"].by_type(ifc_class):
+            # first match wins, as with a linear search
+            if not item.Name in index:
+                index[item.Name] = item
+        library["index"][ifc_class] = index
+    return library["index"][ifc_class].get(name)
+
+
+def absolute_share_dir(share_dir):
+    """Relative paths are relative to the folder above this module"""
+    if not os.path.isabs(share_dir):
+        share_dir = os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "..", share_dir)
+        )
+    return os.path.normpath(share_dir)
+
+
+def signature(share_dir):
+    """Path, modification time and size of every file in share_dir, changes
+    whenever any file is edited, added or removed"""
+    result = []
+    for root, dirs, files in os.walk(share_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            relpath = os.path.relpath(path, share_dir)
+            result.append((relpath, stat.st_mtime_ns, stat.st_size))
+    return sorted(result)
+
+
+def get_style(share_dir="share", cache_dir=None):
+    """Retrieve a Style for share_dir, only reading the files again if any have
+    changed. Optionally a compiled snapshot is kept in cache_dir for faster
+    loading by other processes"""
+    share_dir = absolute_share_dir(share_dir)
+    mysignature = signature(share_dir)
+    if share_dir in registry and registry[share_dir].signature == mysignature:
+        return registry[share_dir]
+
+    style = None
+    if not cache_dir == None:
+        style = read_snapshot(cache_dir, share_dir, mysignature)
+    if style == None:
+        style = Style({"share_dir": share_dir})
+        style.signature = mysignature
+        if not cache_dir == None:
+            write_snapshot(cache_dir, style)
+    registry[share_dir] = style
+    return style
+
+
+def snapshot_path(cache_dir, share_dir):
+    """Each share_dir gets its own snapshot file"""
+    digest = hashlib.sha1(share_dir.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "style-" + digest + ".pickle")
+
+
+def read_snapshot(cache_dir, share_dir, mysignature):
+    """Load a pickled Style, or None if missing, unreadable or out of date"""
+    path = snapshot_path(cache_dir, share_dir)
+    try:
+        with open(path, "rb") as fh:
+            style = pickle.load(fh)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError):
+        return None
+    if not type(style) == Style or not style.share_dir == share_dir:
+        return None
+    if not getattr(style, "signature", None) == mysignature:
+        return None
+    return style
+
+
+def write_snapshot(cache_dir, style):
+    """Pickle the parsed data of a Style, IFC libraries are not included"""
+    libraries = style.libraries
+    style.libraries = {
+        stylename: {
+            prefix: {"path": library["path"], "file": None, "index": {}}
+            for prefix, library in libraries[stylename].items()
+        }
+        for stylename in libraries
+    }
+    flattened = style.flattened
+    style.flattened = {}
+    path = snapshot_path(cache_dir, style.share_dir)
+    temp_path = path + "." + str(os.getpid())
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # write and rename so other processes never see a partial file
+        with open(temp_path, "wb") as fh:
+            pickle.dump(style, fh)
+        os.replace(temp_path, path)
+    except (OSError, pickle.PicklingError):
+        pass
+    finally:
+        # left behind if writing failed
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        style.libraries = libraries
+        style.flattened = flattened
@@ -142,6 +142,17 @@ class Tests(unittest.TestCase):
             # it should be the same Face we started with
             self.assertTrue(face.IsSame(entity))
 
+    def test_vertex_lookup(self):
+        graph = self.cc.Adjacency()
+        lookup = graph.VertexLookup()
+        self.assertEqual(len(lookup), 6)
+        self.assertTrue(graph.VertexLookup() is lookup)
+        for (myclass, index), vertex in lookup.items():
+            self.assertEqual(vertex.Get("class"), myclass)
+            self.assertEqual(vertex.Get("index"), index)
+        graph.Circulation(self.cc)
+        self.assertEqual(len(graph.VertexLookup()), 4)
+
     def test_isconnected(self):
         graph = self.cc.Adjacency()
         self.assertTrue(graph.IsConnected())
@@ -170,6 +181,18 @@ class Tests(unittest.TestCase):
         self.assertEqual(len(edges_ptr), 2)
 
         self.assertFalse(graph.IsConnected())
+        components = graph.Components()
+        self.assertTrue(len(components) > 1)
+        unreachable = graph.UnreachableCells()
+        self.assertEqual(len(components[0]) + len(unreachable), 3)
+        for vertex in unreachable:
+            self.assertEqual(vertex.Get("class"), "Cell")
+
+        # disconnected cells don't prevent measuring the rest
+        table = graph.ShortestPathTable()
+        for vertex in unreachable:
+            self.assertFalse(vertex.Get("index") in table)
+        graph.Separation(table, self.cc)
         dot = graph.Dot(self.cc)
         self.assertTrue(type(dot) == str)
 
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import molior.ifc
+from molior.ifc import (
+    get_material_by_name,
+    get_type_object,
+    get_library_by_name,
+    purge_unused,
+    asset_caches,
+)
+from molior.style import Style
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.file = molior.ifc.init(name="Our Project")
+        self.style_object = Style()
+
+    def test_material(self):
+        screed = get_material_by_name(
+            self.file, self.style_object, stylename="courtyard", name="Screed"
+        )
+        self.assertEqual(screed.Name, "Screed")
+        count = len(self.file.by_type("IfcMaterial"))
+        self.assertEqual(
+            get_material_by_name(
+                self.file, self.style_object, stylename="courtyard", name="Screed"
+            ),
+            screed,
+        )
+        self.assertEqual(len(self.file.by_type("IfcMaterial")), count)
+        self.assertEqual(asset_caches[self.file]["materials"]["Screed"], screed.id())
+
+        # deleted by other means, forgotten when next looked up
+        self.file.remove(screed)
+        screed = get_material_by_name(
+            self.file, self.style_object, stylename="courtyard", name="Screed"
+        )
+        self.assertEqual(self.file.by_id(screed.id()), screed)
+        self.assertEqual(len(self.file.by_type("IfcMaterial")), count)
+
+    def test_type_object(self):
+        mytype = get_type_object(
+            self.file,
+            self.style_object,
+            ifc_type="IfcWallType",
+            stylename="default",
+            name="nonsuch",
+        )
+        self.assertEqual(mytype.Name, "nonsuch")
+        self.assertEqual(
+            get_type_object(
+                self.file,
+                self.style_object,
+                ifc_type="IfcWallType",
+                stylename="default",
+                name="nonsuch",
+            ),
+            mytype,
+        )
+        self.assertEqual(len(self.file.by_type("IfcWallType")), 1)
+        self.assertEqual(
+            get_library_by_name(self.file, "default"),
+            get_library_by_name(self.file, "default"),
+        )
+        self.assertEqual(len(self.file.by_type("IfcProjectLibrary")), 1)
+
+        # unused type objects are purged, and forgotten
+        purge_unused(self.file)
+        self.assertFalse(self.file in asset_caches)
+
+
+if __name__ == "__main__":
+    unittest.main()
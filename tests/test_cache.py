@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+from topologic import Vertex, Face, CellComplex
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import topologist.face
+from topologist.cache import Cache
+
+assert topologist.face
+
+
+class Tests(unittest.TestCase):
+    """Nine faces and two cells formed by a cube sliced on the diagonal"""
+
+    def setUp(self):
+        points = [
+            [0.0, 0.0, 0.0],
+            [10.0, 0.0, 0.0],
+            [10.0, 10.0, 0.0],
+            [0.0, 10.0, 0.0],
+            [0.0, 0.0, 10.0],
+            [10.0, 0.0, 10.0],
+            [10.0, 10.0, 10.0],
+            [0.0, 10.0, 10.0],
+        ]
+        vertices = [Vertex.ByCoordinates(*point) for point in points]
+        faces_by_vertex_id = [
+            [0, 1, 2],
+            [0, 2, 3],
+            [1, 2, 6, 5],
+            [2, 3, 7, 6],
+            [0, 4, 7, 3],
+            [0, 1, 5, 4],
+            [4, 5, 6],
+            [4, 6, 7],
+            [0, 2, 6, 4],
+        ]
+        faces_ptr = [
+            Face.ByVertices([vertices[index] for index in face])
+            for face in faces_by_vertex_id
+        ]
+        self.cc = CellComplex.ByFaces(faces_ptr, 0.0001)
+        self.cc.IndexTopology()
+
+    def test_cache(self):
+        cache = Cache()
+        self.assertEqual(cache.get("a", lambda: 1), 1)
+        self.assertEqual(cache.get("a", lambda: 2), 1)
+        self.assertEqual(cache.info()["hits"], 1)
+        self.assertEqual(cache.info()["misses"], 1)
+        self.assertEqual(cache.info()["currsize"], 1)
+        cache.clear()
+        self.assertEqual(cache.get("a", lambda: 2), 2)
+        self.assertEqual(cache.info()["hits"], 0)
+
+    def test_host_cache(self):
+        self.assertEqual(self.cc.CacheInfo()["currsize"], 0)
+        faces_ptr = []
+        self.cc.Faces(None, faces_ptr)
+        for face in faces_ptr:
+            face.IsWorld(self.cc)
+            face.IsWorld(self.cc)
+        info = self.cc.CacheInfo()
+        self.assertEqual(info["misses"], len(faces_ptr) * 2)
+        self.assertEqual(info["hits"], len(faces_ptr))
+        self.assertTrue(self.cc.Cache() is self.cc.Cache())
+
+        # rebuilding the model invalidates everything
+        self.cc.IndexTopology()
+        self.assertEqual(self.cc.CacheInfo()["currsize"], 0)
+        self.assertEqual(self.cc.CacheInfo()["hits"], 0)
+
+    def test_world(self):
+        faces_ptr = []
+        self.cc.Faces(None, faces_ptr)
+        world = [face for face in faces_ptr if face.IsWorld(self.cc)]
+        self.assertEqual(len(world), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
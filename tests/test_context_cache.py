@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import molior.ifc
+from molior.ifc import get_context_by_name, context_caches
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.file = molior.ifc.init(name="Our Project")
+
+    def test_cached(self):
+        # default contexts are cached as they are created
+        self.assertTrue(("Model", "Body", "MODEL_VIEW") in context_caches[self.file])
+        body = get_context_by_name(self.file, context_identifier="Body")
+        self.assertEqual(body.ContextIdentifier, "Body")
+        self.assertTrue(
+            get_context_by_name(self.file, context_identifier="Body") is body
+        )
+        count = len(self.file.by_type("IfcGeometricRepresentationSubContext"))
+
+        # a new context is created once
+        profile = get_context_by_name(
+            self.file,
+            parent_context_identifier="Model",
+            context_identifier="Profile",
+            target_view="ELEVATION_VIEW",
+        )
+        get_context_by_name(
+            self.file,
+            parent_context_identifier="Model",
+            context_identifier="Profile",
+            target_view="ELEVATION_VIEW",
+        )
+        self.assertEqual(profile.ContextIdentifier, "Profile")
+        self.assertEqual(
+            len(self.file.by_type("IfcGeometricRepresentationSubContext")), count + 1
+        )
+
+    def test_removed(self):
+        profile = get_context_by_name(
+            self.file,
+            parent_context_identifier="Model",
+            context_identifier="Profile",
+            target_view="ELEVATION_VIEW",
+        )
+        # deleted by other means, forgotten when next looked up
+        self.file.remove(profile)
+        profile = get_context_by_name(
+            self.file,
+            parent_context_identifier="Model",
+            context_identifier="Profile",
+            target_view="ELEVATION_VIEW",
+        )
+        self.assertEqual(profile.ContextIdentifier, "Profile")
+        self.assertEqual(self.file.by_id(profile.id()), profile)
+
+    def test_separate_files(self):
+        other = molior.ifc.init(name="Other Project")
+        self.assertNotEqual(
+            get_context_by_name(other, context_identifier="Body"),
+            get_context_by_name(self.file, context_identifier="Body"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+from topologic import Vertex, Face
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import topologist.topology
+from molior import Molior
+from molior.fragment import geometry_key, Signatures
+from molior.ifc import get_fragments, delete_ifc_product
+
+assert topologist.topology
+
+
+class Tests(unittest.TestCase):
+    """Nine faces and two cells formed by a cube sliced on the diagonal"""
+
+    def faces(self, offset=0.0):
+        points = [
+            [0.0, 0.0, 0.0],
+            [10.0, 0.0, 0.0],
+            [10.0, 10.0, 0.0],
+            [0.0, 10.0, 0.0],
+            [0.0, 0.0, 10.0],
+            [10.0, 0.0, 10.0],
+            [10.0, 10.0, 10.0],
+            [0.0, 10.0, 10.0],
+        ]
+        vertices = [
+            Vertex.ByCoordinates(point[0] + offset, point[1], point[2])
+            for point in points
+        ]
+        faces_by_vertex_id = [
+            [0, 1, 2],
+            [0, 2, 3],
+            [1, 2, 6, 5],
+            [2, 3, 7, 6],
+            [0, 4, 7, 3],
+            [0, 1, 5, 4],
+            [4, 5, 6],
+            [4, 6, 7],
+            [0, 2, 6, 4],
+        ]
+        faces_ptr = []
+        for face in faces_by_vertex_id:
+            face_ptr = Face.ByVertices([vertices[index] for index in face])
+            face_ptr.Set("stylename", "default")
+            faces_ptr.append(face_ptr)
+        return faces_ptr
+
+    def test_geometry_key(self):
+        self.assertEqual(
+            geometry_key([[1.0, 2.0, 3.0], [0.0, 0.0, 0.00001]]),
+            geometry_key([(0.0, 0.0, 0.0), (1.0001, 2.0, 3.0)]),
+        )
+
+    def test_separation(self):
+        # only Spaces depend on separation, which changes with circulation
+        molior = Molior.from_faces_and_widgets(faces=self.faces(), name="My Building")
+        signatures = Signatures(style=Molior.style)
+        self.assertTrue(signatures.uses_separation("default", "living"))
+        self.assertFalse(signatures.uses_separation("default", "external"))
+        cells_ptr = []
+        molior.cellcomplex.Cells(None, cells_ptr)
+        cell = cells_ptr[0]
+        cell.Set("separation", "1.0")
+        before = [signatures.cell(cell), signatures.cell(cell, True)]
+        cell.Set("separation", "2.0")
+        signatures = Signatures(style=Molior.style)
+        self.assertEqual(signatures.cell(cell), before[0])
+        self.assertNotEqual(signatures.cell(cell, True), before[1])
+
+    def test_incremental(self):
+        # Fragments are only recorded when asked for
+        molior = Molior.from_faces_and_widgets(faces=self.faces(), name="My Building")
+        molior.execute()
+        self.assertEqual(get_fragments(molior.file, molior.building), {})
+
+        molior = Molior.from_faces_and_widgets(faces=self.faces(), name="My Building")
+        molior.execute(incremental=True)
+        ifc = molior.file
+        fragments = get_fragments(ifc, molior.building)
+        self.assertTrue(len(fragments) > 0)
+        walls = len(ifc.by_type("IfcWall"))
+        storeys = len(ifc.by_type("IfcBuildingStorey"))
+
+        # same geometry with a different Face order, so different index numbers
+        molior = Molior.from_faces_and_widgets(
+            file=ifc, faces=list(reversed(self.faces())), name="My Building"
+        )
+        molior.execute(incremental=True)
+        self.assertEqual(get_fragments(ifc, molior.building), fragments)
+        self.assertEqual(len(ifc.by_type("IfcWall")), walls)
+        self.assertEqual(len(ifc.by_type("IfcBuilding")), 1)
+        self.assertEqual(len(ifc.by_type("IfcBuildingStorey")), storeys)
+
+        # a restyled Face only replaces products that use it
+        faces_ptr = self.faces()
+        faces_ptr[2].Set("stylename", "blank")
+        molior = Molior.from_faces_and_widgets(
+            file=ifc, faces=faces_ptr, name="My Building"
+        )
+        molior.execute(incremental=True)
+        changed = get_fragments(ifc, molior.building)
+        self.assertNotEqual(set(changed), set(fragments))
+        self.assertTrue(set(changed) & set(fragments))
+
+        # Fragments are deleted along with the Building
+        delete_ifc_product(ifc, molior.building)
+        self.assertEqual(
+            [
+                group
+                for group in ifc.by_type("IfcGroup")
+                if group.ObjectType == "Fragment"
+            ],
+            [],
+        )
+
+    def test_cache(self):
+        # two identical buildings side by side
+        faces_ptr = self.faces() + self.faces(offset=20.0)
+        molior = Molior.from_faces_and_widgets(faces=faces_ptr, name="Built")
+        molior.execute()
+        built = molior.file
+        molior = Molior.from_faces_and_widgets(faces=faces_ptr, name="Copied")
+        molior.execute(cache=True)
+        copied = molior.file
+        for ifc_class in [
+            "IfcWall",
+            "IfcSpace",
+            "IfcRelSpaceBoundary",
+            "IfcProduct",
+            "IfcStyledItem",
+        ]:
+            self.assertEqual(
+                len(copied.by_type(ifc_class)), len(built.by_type(ifc_class))
+            )
+        # copies are moved into place, not stacked on the originals
+        self.assertEqual(len(wall_locations(copied)), len(wall_locations(built)))
+
+    def test_parallel(self):
+        faces_ptr = self.faces() + self.faces(offset=20.0)
+        molior = Molior.from_faces_and_widgets(faces=faces_ptr, name="Serial")
+        molior.execute(incremental=True)
+        serial = molior.file
+        molior = Molior.from_faces_and_widgets(faces=faces_ptr, name="Parallel")
+        molior.execute(incremental=True, processes=2)
+        parallel = molior.file
+        for ifc_class in [
+            "IfcWall",
+            "IfcSpace",
+            "IfcBuildingStorey",
+            "IfcStructuralSurfaceMember",
+            "IfcStructuralConnection",
+            "IfcRelSpaceBoundary",
+            "IfcProduct",
+            "IfcTypeObject",
+            "IfcMaterial",
+            "IfcStyledItem",
+        ]:
+            self.assertEqual(
+                len(parallel.by_type(ifc_class)), len(serial.by_type(ifc_class))
+            )
+        self.assertEqual(
+            set(get_fragments(parallel, molior.building)),
+            set(get_fragments(serial, serial.by_type("IfcBuilding")[0])),
+        )
+
+
+def wall_locations(ifc):
+    return set(
+        [
+            wall.ObjectPlacement.RelativePlacement.Location.Coordinates
+            for wall in ifc.by_type("IfcWall")
+        ]
+    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -54,6 +54,20 @@ class Tests(unittest.TestCase):
         self.assertEqual(len(cycles), 1)
         self.assertEqual(len(cycles[0].nodes()), 4)
 
+    def test_unchanged(self):
+        edges = dict(self.graph.graph)
+        self.assertEqual(len(self.graph.find_paths()), 3)
+        self.assertEqual(self.graph.graph, edges)
+        self.assertEqual(len(self.graph.find_paths()), 3)
+
+    def test_long_chain(self):
+        chain = ugraph.graph()
+        for node in range(100000):
+            chain.add_edge({node: [node + 1, None]})
+        paths = chain.find_paths()
+        self.assertEqual(len(paths), 1)
+        self.assertEqual(len(paths[0].graph), 100000)
+
     def test_edge_data(self):
         self.assertEqual(self.graph.get_edge_data(["E", "F"]), "fa")
         self.assertEqual(self.graph.get_edge_data(["F", "E"]), "fa")
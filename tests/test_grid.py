@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+from topologic import Vertex, Face
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from topologist.grid import Grid, bounding_box
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        # a row of ten unit squares, and one large box overlapping all of them
+        boxes = [[[x, 0.0, 0.0], [x + 1.0, 1.0, 0.0]] for x in range(10)]
+        boxes.append([[0.0, 0.0, -5.0], [10.0, 1.0, 5.0]])
+        self.grid = Grid(boxes)
+
+    def test_point(self):
+        self.assertEqual(self.grid.query([3.5, 0.5, 0.0]), [3, 10])
+        # shared boundary within tolerance
+        self.assertEqual(self.grid.query([4.0, 0.5, 0.0]), [3, 4, 10])
+        self.assertEqual(self.grid.query([3.5, 0.5, 2.0]), [10])
+        self.assertEqual(self.grid.query([3.5, 5.0, 0.0]), [])
+
+    def test_box(self):
+        self.assertEqual(
+            self.grid.query([2.5, 0.5, 0.0], [4.5, 0.5, 0.0]), [2, 3, 4, 10]
+        )
+
+    def test_points(self):
+        # widgets in a 5 x 5 x 3 grid of Cells
+        points = [
+            Vertex.ByCoordinates(x * 5.0 + 2.5, y * 5.0 + 2.5, z * 3.0 + 1.5)
+            for x in range(5)
+            for y in range(5)
+            for z in range(3)
+        ]
+        grid = Grid([bounding_box(point) for point in points])
+        self.assertGreater(grid.size, 1.0)
+        # query the size of a Cell
+        items = grid.query([5.0, 5.0, 3.0], [10.0, 10.0, 6.0])
+        self.assertEqual(items, [19])
+        # a single point
+        single = Grid([bounding_box(points[0])])
+        self.assertEqual(single.query([0.0, 0.0, 0.0], [5.0, 5.0, 3.0]), [0])
+        self.assertEqual(single.query([0.0, 0.0, 0.0], [2.0, 2.0, 3.0]), [])
+
+    def test_empty(self):
+        self.assertEqual(Grid([]).query([0.0, 0.0, 0.0]), [])
+
+    def test_bounding_box(self):
+        vertex = Vertex.ByCoordinates(1.0, 2.0, 3.0)
+        self.assertEqual(bounding_box(vertex), [[1.0, 2.0, 3.0], [1.0, 2.0, 3.0]])
+        face = Face.ByVertices(
+            [
+                Vertex.ByCoordinates(0.0, 0.0, 0.0),
+                Vertex.ByCoordinates(4.0, 0.0, 0.0),
+                Vertex.ByCoordinates(4.0, 0.0, 3.0),
+            ]
+        )
+        self.assertEqual(bounding_box(face), [[0.0, 0.0, 0.0], [4.0, 0.0, 3.0]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+from topologic import Vertex, Face, CellComplex
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import topologist.cellcomplex
+
+assert topologist.cellcomplex
+
+
+class Tests(unittest.TestCase):
+    """14 faces and three cells formed by a cube sliced on the diagonal"""
+
+    def setUp(self):
+
+        points = [
+            [0.0, 0.0, 0.0],
+            [10.0, 0.0, 0.0],
+            [10.0, 10.0, 0.0],
+            [0.0, 10.0, 0.0],
+            [0.0, 0.0, 10.0],
+            [10.0, 0.0, 10.0],
+            [10.0, 10.0, 10.0],
+            [0.0, 10.0, 10.0],
+        ]
+
+        points.extend(
+            [[0.0, 0.0, 20.0], [10.0, 0.0, 20.0], [10.0, 10.0, 20.0], [0.0, 10.0, 20.0]]
+        )
+
+        vertices = []
+        for point in points:
+            vertex = Vertex.ByCoordinates(point[0], point[1], point[2])
+            vertices.append(vertex)
+
+        faces_by_vertex_id = [
+            [0, 1, 2],
+            [0, 2, 3],
+            [1, 2, 6, 5],
+            [2, 3, 7, 6],
+            [0, 4, 7, 3],
+            [0, 1, 5, 4],
+            [4, 5, 6],
+            [4, 6, 7],
+            [0, 2, 6, 4],
+        ]
+
+        faces_by_vertex_id.extend(
+            [[4, 5, 9, 8], [5, 6, 10, 9], [6, 7, 11, 10], [7, 4, 8, 11], [8, 9, 10, 11]]
+        )
+
+        faces = []
+        for face_by_id in faces_by_vertex_id:
+            vertices_face = []
+            for point_id in face_by_id:
+                vertex = vertices[point_id]
+                vertices_face.append(vertex)
+            face_by_vertices = Face.ByVertices(vertices_face)
+            faces.append(face_by_vertices)
+
+        faces_ptr = []
+        for face in faces:
+            faces_ptr.append(face)
+        self.cc = CellComplex.ByFaces(faces_ptr, 0.0001)
+        # Give every Cell and Face an index number
+        self.cc.IndexTopology()
+
+    def test_index(self):
+        index = self.cc.BuildIndex()
+        self.assertTrue(self.cc.Index() is index)
+        self.assertEqual(len(index.faces), 14)
+        self.assertEqual(len(index.cells), 3)
+        self.assertEqual(len(index.face_cells), 14)
+        self.assertEqual(len(index.cell_faces), 3)
+        # three faces are between two cells
+        shared = [cells for cells in index.face_cells if len(cells) == 2]
+        self.assertEqual(len(shared), 3)
+        for edge_faces in index.edge_faces:
+            self.assertGreater(len(edge_faces), 1)
+        for vertex_edges in index.vertex_edges:
+            self.assertGreater(len(vertex_edges), 2)
+
+    def test_same_results(self):
+        faces_ptr = []
+        self.cc.Faces(None, faces_ptr)
+        world = [face.IsWorld(self.cc) for face in faces_ptr]
+        counts = [len(face.Cells_Cached(self.cc)) for face in faces_ptr]
+        self.cc.BuildIndex()
+        self.assertEqual(world, [face.IsWorld(self.cc) for face in faces_ptr])
+        self.assertEqual(
+            counts, [len(face.Cells_Cached(self.cc)) for face in faces_ptr]
+        )
+
+        edges_ptr = []
+        self.cc.Edges(None, edges_ptr)
+        for edge in edges_ptr:
+            topologic_faces_ptr = []
+            edge.Faces(self.cc, topologic_faces_ptr)
+            self.assertEqual(len(edge.Faces_Cached(self.cc)), len(topologic_faces_ptr))
+
+    def test_clear(self):
+        self.cc.BuildIndex()
+        self.cc.IndexTopology()
+        self.assertEqual(self.cc.Index(), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
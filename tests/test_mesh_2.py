@@ -13,7 +13,7 @@ from topologic import (
 )
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from topologist.helpers import string_to_coor
+from topologist.helpers import coor_to_key, key_to_coor
 
 
 class Tests(unittest.TestCase):
@@ -190,8 +190,10 @@ class Tests(unittest.TestCase):
         cycle = lower[0]
         self.assertTrue(cycle.is_simple_cycle())
         for node in cycle.nodes():
-            self.assertEqual(string_to_coor(node)[2], 0.0)
-        data = cycle.get_edge_data(["0.0__10.0__0.0", "0.0__0.0__0.0"])
+            self.assertEqual(key_to_coor(node)[2], 0.0)
+        data = cycle.get_edge_data(
+            [coor_to_key([0.0, 10.0, 0.0]), coor_to_key([0.0, 0.0, 0.0])]
+        )
         self.assertEqual(len(data), 5)
         # self.assertEqual(data[0].GetType(), 1)  # Vertex == 1
         # self.assertEqual(data[1].GetType(), 1)  # Vertex == 1
@@ -210,8 +212,8 @@ class Tests(unittest.TestCase):
 
         nodes = upper[0].nodes()
         for node in nodes:
-            self.assertEqual(string_to_coor(node)[2], 10.0)
-            self.assertEqual(len(string_to_coor(node)[0:2]), 2)
+            self.assertEqual(key_to_coor(node)[2], 10.0)
+            self.assertEqual(len(key_to_coor(node)[0:2]), 2)
 
         traces_internal = traces["internal"][0.0][10.0]["default"]
         for graph in traces_internal:
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+from topologic import Vertex, Face, CellComplex
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import topologist.topology
+from topologist.mesh import Mesh, mesh_faces
+
+assert topologist.topology
+
+
+class Tests(unittest.TestCase):
+    """Nine faces and two cells formed by a cube sliced on the diagonal"""
+
+    def setUp(self):
+        points = [
+            [0.0, 0.0, 0.0],
+            [10.0, 0.0, 0.0],
+            [10.0, 10.0, 0.0],
+            [0.0, 10.0, 0.0],
+            [0.0, 0.0, 10.0],
+            [10.0, 0.0, 10.0],
+            [10.0, 10.0, 10.0],
+            [0.0, 10.0, 10.0],
+        ]
+        vertices = [Vertex.ByCoordinates(*point) for point in points]
+        faces_by_vertex_id = [
+            [0, 1, 2],
+            [0, 2, 3],
+            [1, 2, 6, 5],
+            [2, 3, 7, 6],
+            [0, 4, 7, 3],
+            [0, 1, 5, 4],
+            [4, 5, 6],
+            [4, 6, 7],
+            [0, 2, 6, 4],
+        ]
+        self.faces_ptr = [
+            Face.ByVertices([vertices[index] for index in face])
+            for face in faces_by_vertex_id
+        ]
+        self.cc = CellComplex.ByFaces(self.faces_ptr, 0.0001)
+
+    def test_vertex_id(self):
+        mesh = Mesh()
+        self.assertEqual(mesh.vertex_id([0.0, 0.0, 0.0]), 0)
+        self.assertEqual(mesh.vertex_id([1.0, 0.0, 0.0]), 1)
+        # within tolerance
+        self.assertEqual(mesh.vertex_id([1.00000001, 0.0, 0.0]), 1)
+        self.assertEqual(mesh.vertices().shape, (2, 3))
+
+    def test_mesh(self):
+        vertices, faces = self.cc.Mesh()
+        self.assertEqual(len(vertices), 8)
+        self.assertEqual(len(faces), 9)
+        for face in faces:
+            self.assertTrue(len(face) in [3, 4])
+            for index in face:
+                self.assertTrue(index < 8)
+
+    def test_mesh_arrays(self):
+        cells_ptr = []
+        self.cc.Cells(None, cells_ptr)
+        for cell in cells_ptr:
+            vertices, faces = cell.MeshArrays()
+            self.assertEqual(vertices.shape, (6, 3))
+            self.assertEqual(len(faces), 5)
+
+    def test_batch(self):
+        # separate Faces share the same vertex pool
+        vertices, faces = mesh_faces(self.faces_ptr)
+        self.assertEqual(vertices.shape, (8, 3))
+        self.assertEqual(len(faces), 9)
+        self.assertEqual(faces[0][0], faces[1][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+import numpy
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import topologist.normals
+from topologist.helpers import coor_to_key
+
+
+class Tests(unittest.TestCase):
+    def test_normals(self):
+        normals = topologist.normals.Normals(capacity=2)
+        # two walls meeting at a corner, a third wall elsewhere
+        normals.add_vector("bottom", [0.0, 0.0, 3.0001], numpy.array([0.0, -1.0, 0.0]))
+        normals.add_vector("bottom", [5.0, 0.0, 3.0], numpy.array([0.0, -1.0, 0.0]))
+        normals.add_vector("bottom", [5.0, 0.0, 3.0], numpy.array([1.0, 0.0, 0.0]))
+        normals.add_vector("bottom", [5.0, 5.0, 3.0], numpy.array([1.0, 0.0, 0.0]))
+        normals.add_vector("top", [5.0, 0.0, 6.0], numpy.array([3.0, 0.0, 0.0]))
+        normals.process()
+
+        self.assertEqual(len(normals.normals["bottom"]), 3)
+        self.assertEqual(len(normals.normals["top"]), 1)
+        corner = normals.normals["bottom"][coor_to_key([5.0, 0.0, 3.0])]
+        self.assertAlmostEqual(corner[0], 0.5**0.5)
+        self.assertAlmostEqual(corner[1], -(0.5**0.5))
+        # elevations are rounded to millimetres
+        start = normals.normals["bottom"][coor_to_key([0.0, 0.0, 3.0])]
+        self.assertEqual(list(start), [0.0, -1.0, 0.0])
+        self.assertEqual(list(normals.normals["top"].values())[0][0], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1001,6 +1001,21 @@ class Tests(unittest.TestCase):
             elevations=elevations,
         )
         molior_object.execute()
+
+        # structural connections are only created where they join members
+        ifc = molior_object.file
+        for connection in ifc.by_type("IfcStructuralCurveConnection"):
+            self.assertTrue(len(connection.ConnectsStructuralMembers) > 1)
+        # coincident point connections are merged
+        points = [
+            tuple(
+                connection.Representation.Representations[0]
+                .Items[0]
+                .VertexGeometry.Coordinates
+            )
+            for connection in ifc.by_type("IfcStructuralPointConnection")
+        ]
+        self.assertEqual(len(points), len(set(points)))
         molior_object.file.write("_test.ifc")
 
 
@@ -0,0 +1,45 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import molior.ifc
+from molior.ifc import purge_unused, get_context_by_name
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        self.file = molior.ifc.init(name="Our Project")
+
+    def test_purge(self):
+        body_context = get_context_by_name(self.file, context_identifier="Body")
+        # an orphaned polyline, the shared point is only deleted once unused
+        point = self.file.createIfcCartesianPoint([0.0, 0.0, 0.0])
+        polyline = self.file.createIfcPolyline(
+            [point, self.file.createIfcCartesianPoint([1.0, 0.0, 0.0]), point]
+        )
+        self.file.createIfcShapeRepresentation(
+            body_context, "Body", "Curve", [polyline]
+        )
+        # a used point is kept
+        used = self.file.createIfcCartesianPoint([2.0, 0.0, 0.0])
+        self.file.createIfcVertexPoint(used)
+        point_id = point.id()
+        used_id = used.id()
+
+        removed = purge_unused(self.file)
+        self.assertEqual(removed["IfcShapeRepresentation"], 1)
+        self.assertEqual(removed["IfcPolyline"], 1)
+        self.assertTrue(removed["IfcCartesianPoint"] >= 2)
+        self.assertEqual(len(self.file.by_type("IfcPolyline")), 0)
+        with self.assertRaises(RuntimeError):
+            self.file.by_id(point_id)
+        self.assertEqual(self.file.by_id(used_id).Coordinates, (2.0, 0.0, 0.0))
+        # nothing left to do
+        self.assertEqual(purge_unused(self.file), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
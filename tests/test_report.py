@@ -0,0 +1,97 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+from topologic import Vertex, Face
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import topologist.topology
+from molior import Molior
+from molior.report import Report, measure
+
+assert topologist.topology
+
+
+class Tests(unittest.TestCase):
+    """Nine faces and two cells formed by a cube sliced on the diagonal"""
+
+    def setUp(self):
+        points = [
+            [0.0, 0.0, 0.0],
+            [10.0, 0.0, 0.0],
+            [10.0, 10.0, 0.0],
+            [0.0, 10.0, 0.0],
+            [0.0, 0.0, 10.0],
+            [10.0, 0.0, 10.0],
+            [10.0, 10.0, 10.0],
+            [0.0, 10.0, 10.0],
+        ]
+        vertices = [Vertex.ByCoordinates(*point) for point in points]
+        faces_by_vertex_id = [
+            [0, 1, 2],
+            [0, 2, 3],
+            [1, 2, 6, 5],
+            [2, 3, 7, 6],
+            [0, 4, 7, 3],
+            [0, 1, 5, 4],
+            [4, 5, 6],
+            [4, 6, 7],
+            [0, 2, 6, 4],
+        ]
+        self.faces_ptr = [
+            Face.ByVertices([vertices[index] for index in face])
+            for face in faces_by_vertex_id
+        ]
+
+    def test_disabled(self):
+        with measure(None, "nothing"):
+            pass
+        molior = Molior.from_faces_and_widgets(faces=self.faces_ptr)
+        molior.execute()
+        self.assertEqual(molior.report, None)
+
+    def test_counters(self):
+        report = Report()
+        report.count("fragment cache", True, 3)
+        report.count("fragment cache", False)
+        report.merge(
+            {"Wall": {"count": 2, "seconds": 0.5, "entities": 10}},
+            {"fragment cache": {"hits": 0, "misses": 4}},
+        )
+        self.assertEqual(report.hit_rates()["fragment cache"], 0.375)
+        self.assertEqual(report.parts["Wall"]["entities"], 10)
+
+    def test_report(self):
+        log = os.path.join(tempfile.mkdtemp(), "log.json")
+        report = Report(log=log)
+        molior = Molior.from_faces_and_widgets(faces=self.faces_ptr, report=report)
+        molior.execute(cache=True)
+        for stage in [
+            "CellComplex.ByFaces",
+            "IndexTopology",
+            "Circulation",
+            "GetTraces",
+            "GetHulls",
+            "build",
+            "connect_structure",
+            "connect_spaces",
+            "stash_topology",
+        ]:
+            self.assertEqual(report.stages[stage]["calls"], 1)
+        self.assertGreater(report.stages["build"]["entities"], 0)
+        self.assertGreater(report.parts["Wall"]["count"], 0)
+        self.assertGreater(report.parts["Wall"]["entities"], 0)
+        self.assertTrue("fragment cache" in report.counters)
+
+        # one line per stage in the log, and the whole report is JSON
+        with open(log) as records:
+            self.assertEqual(len(records.readlines()), len(report.stages))
+        json.dumps(report.as_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from topologist.routes import Routes
+
+
+class Tests(unittest.TestCase):
+    def setUp(self):
+        # a triangle with a short-cut: A B C, and a separate pair D E
+        self.routes = Routes(5, [[0, 1, 1.0], [1, 2, 2.0], [0, 2, 5.0], [3, 4, 1.5]])
+
+    def test_csr(self):
+        self.assertEqual(len(self.routes.indptr), 6)
+        self.assertEqual(len(self.routes.indices), 8)
+        self.assertEqual(sorted(self.routes.neighbours(0)), [1, 2])
+        self.assertEqual(self.routes.neighbours(4), [3])
+
+    def test_dijkstra(self):
+        distances = self.routes.dijkstra(0)
+        self.assertEqual(distances[0], 0.0)
+        self.assertEqual(distances[1], 1.0)
+        self.assertEqual(distances[2], 3.0)
+        self.assertEqual(distances[3], None)
+        self.assertEqual(self.routes.dijkstra(4)[3], 1.5)
+
+    def test_components(self):
+        labels = self.routes.components()
+        self.assertEqual(labels[0], labels[1])
+        self.assertEqual(labels[0], labels[2])
+        self.assertEqual(labels[3], labels[4])
+        self.assertNotEqual(labels[0], labels[3])
+        self.assertEqual(Routes(3, []).components(), [0, 1, 2])
+
+    def test_table(self):
+        table = self.routes.table([0, 1, 2])
+        self.assertEqual(table[0][2], 3.0)
+        self.assertEqual(table[2][0], 3.0)
+        self.assertEqual(table[1][2], 2.0)
+        self.assertFalse(0 in table[0])
+        # unreachable nodes are left out
+        table = self.routes.table([0, 3])
+        self.assertEqual(table[0], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
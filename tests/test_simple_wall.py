@@ -69,8 +69,8 @@ class Tests(unittest.TestCase):
 
         trace.add_edge(
             {
-                axis[0].CoorAsString(): [
-                    axis[1].CoorAsString(),
+                axis[0].CoorAsKey(): [
+                    axis[1].CoorAsKey(),
                     {
                         "start_vertex": axis[0],
                         "end_vertex": axis[1],
@@ -83,8 +83,8 @@ class Tests(unittest.TestCase):
         )
         trace.add_edge(
             {
-                axis2[0].CoorAsString(): [
-                    axis2[1].CoorAsString(),
+                axis2[0].CoorAsKey(): [
+                    axis2[1].CoorAsKey(),
                     {
                         "start_vertex": axis2[0],
                         "end_vertex": axis2[1],
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import unittest
+import ifcopenshell.api
+
+from topologic import Vertex
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import topologist.topology
+import molior.ifc
+from molior.ifc import (
+    get_site_by_name,
+    get_building_by_name,
+    create_storeys,
+    add_cell_topology_epsets,
+    assign_storey_byindex,
+    assign_space_byindex,
+    get_spaces_byindex,
+    get_parent_building,
+    get_topology_epsets,
+    spatial_index,
+)
+
+assert topologist.topology
+
+run = ifcopenshell.api.run
+
+
+class Tests(unittest.TestCase):
+    """Two buildings with the same storey names"""
+
+    def setUp(self):
+        self.ifc = molior.ifc.init(name="My Project")
+        project = self.ifc.by_type("IfcProject")[0]
+        site = get_site_by_name(self.ifc, project, "My Site")
+        self.building_a = get_building_by_name(self.ifc, site, "Building A")
+        self.building_b = get_building_by_name(self.ifc, site, "Building B")
+        create_storeys(self.ifc, self.building_a, {0.0: 0, 3.0: 1})
+        # index is created now, later storeys are added as they are created
+        self.assertEqual(len(spatial_index(self.ifc)["IfcBuildingStorey"]["1"]), 1)
+        create_storeys(self.ifc, self.building_b, {0.0: 0, 3.0: 1})
+        self.assertEqual(len(spatial_index(self.ifc)["IfcBuildingStorey"]["1"]), 2)
+        # existing storeys are reused
+        create_storeys(self.ifc, self.building_b, {0.0: 0, 3.0: 1})
+        self.assertEqual(len(spatial_index(self.ifc)["IfcBuildingStorey"]["1"]), 2)
+
+    def test_storey(self):
+        wall = run("root.create_entity", self.ifc, ifc_class="IfcWall")
+        storey = assign_storey_byindex(self.ifc, wall, self.building_b, 1)
+        self.assertEqual(storey.Name, "1")
+        self.assertEqual(get_parent_building(wall), self.building_b)
+        with self.assertRaises(KeyError):
+            assign_storey_byindex(self.ifc, wall, self.building_b, 5)
+
+    def test_space(self):
+        cell = Vertex.ByCoordinates(0.0, 0.0, 0.0)
+        cell.Set("index", "3")
+        space = run("root.create_entity", self.ifc, ifc_class="IfcSpace")
+        add_cell_topology_epsets(self.ifc, space, cell)
+        # recorded as written, no need to parse psets
+        self.assertEqual(get_topology_epsets(self.ifc)[space], {"CellIndex": "3"})
+        assign_storey_byindex(self.ifc, space, self.building_a, 0)
+        self.assertEqual(get_spaces_byindex(self.ifc, self.building_a), {"3": space})
+        self.assertEqual(get_spaces_byindex(self.ifc, self.building_b), {})
+
+        wall = run("root.create_entity", self.ifc, ifc_class="IfcWall")
+        assign_space_byindex(self.ifc, wall, self.building_a, 3)
+        self.assertEqual(wall.ContainedInStructure[0].RelatingStructure, space)
+
+    def test_removed(self):
+        # storeys deleted without unregistering are forgotten when looked up
+        wall = run("root.create_entity", self.ifc, ifc_class="IfcWall")
+        storey = assign_storey_byindex(self.ifc, wall, self.building_b, 1)
+        run("root.remove_product", self.ifc, product=storey)
+        with self.assertRaises(KeyError):
+            assign_storey_byindex(self.ifc, wall, self.building_b, 1)
+        self.assertEqual(len(spatial_index(self.ifc)["IfcBuildingStorey"]["1"]), 1)
+        create_storeys(self.ifc, self.building_b, {0.0: 0, 3.0: 1})
+        storey = assign_storey_byindex(self.ifc, wall, self.building_b, 1)
+        self.assertEqual(get_parent_building(storey), self.building_b)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,10 +2,13 @@
 
 import os
 import sys
+import copy
+import tempfile
 import unittest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from molior.style import Style
+import molior.style
+from molior.style import Style, get_style
 
 
 class Tests(unittest.TestCase):
@@ -26,6 +29,75 @@ class Tests(unittest.TestCase):
         default2 = mystyle.get("nonsuch")
         self.assertEqual(default, default2)
 
+    def test_cached(self):
+        mystyle = Style()
+        fancy = mystyle.get("fancy")
+        self.assertTrue(mystyle.get("fancy") is fancy)
+        # shared result is read-only
+        with self.assertRaises(TypeError):
+            fancy["traces"] = {}
+        # ancestors fill in the gaps
+        for name in mystyle.get("default")["traces"]:
+            self.assertTrue(name in fancy["traces"])
+
+        # changing share_dir discards everything
+        mystyle.share_dir = os.path.join(mystyle.share_dir, "courtyard")
+        self.assertTrue(mystyle.get("fancy") is mystyle.get("default"))
+        self.assertFalse("fancy" in mystyle.data)
+
+    def test_nested(self):
+        mystyle = Style()
+        fancy = mystyle.get("fancy")
+        name = next(iter(fancy["traces"]))
+        # nested values are read-only too
+        with self.assertRaises(TypeError):
+            fancy["traces"][name]["condition"] = "nonsuch"
+        with self.assertRaises(TypeError):
+            fancy["traces"].pop(name)
+        # deep copies can be modified
+        config = copy.deepcopy(fancy["traces"][name])
+        config["condition"] = "nonsuch"
+        self.assertNotEqual(
+            mystyle.get("fancy")["traces"][name]["condition"], "nonsuch"
+        )
+        for family in mystyle.get("fancy")["families"].values():
+            with self.assertRaises(TypeError):
+                family.append({})
+            self.assertEqual(type(copy.deepcopy(family)), list)
+
+    def test_library(self):
+        mystyle = Style()
+        stylename, library_file, element = mystyle.get_from_library(
+            "courtyard", "IfcMaterial", "Screed"
+        )
+        self.assertEqual(element.Name, "Screed")
+        self.assertEqual(
+            mystyle.get_from_library("courtyard", "IfcMaterial", "Screed")[2], element
+        )
+        library = mystyle.libraries[stylename]["library"]
+        self.assertTrue("Screed" in library["index"]["IfcMaterial"])
+        self.assertEqual(
+            mystyle.get_from_library("courtyard", "IfcMaterial", "Nonsuch"),
+            (None, None, None),
+        )
+
+    def test_registry(self):
+        mystyle = get_style("share")
+        self.assertTrue(get_style("share") is mystyle)
+        self.assertTrue(get_style(mystyle.share_dir) is mystyle)
+
+    def test_snapshot(self):
+        cache_dir = tempfile.mkdtemp()
+        molior.style.registry.clear()
+        mystyle = get_style("share", cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        # a new process would start with an empty registry
+        molior.style.registry.clear()
+        mystyle2 = get_style("share", cache_dir=cache_dir)
+        self.assertFalse(mystyle2 is mystyle)
+        self.assertEqual(mystyle2.data, mystyle.data)
+        self.assertEqual(mystyle2.get("fancy"), mystyle.get("fancy"))
+
 
 if __name__ == "__main__":
     unittest.main()
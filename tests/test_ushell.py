@@ -6,6 +6,7 @@ import unittest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import topologist.ushell as ushell
+from topologist.helpers import coor_to_key, key_to_coor, key_to_string
 
 
 class Tests(unittest.TestCase):
@@ -51,6 +52,39 @@ class Tests(unittest.TestCase):
         self.assertEqual(len(new_shells[1].nodes_all()), 4)
         self.assertEqual(len(new_shells[1].faces_all()), 2)
 
+    def test_keys(self):
+        self.assertEqual(
+            coor_to_key([0.1 + 0.2, 4.0, -1.0]), coor_to_key([0.3, 4.0, -1.0 + 1e-16])
+        )
+        self.assertEqual(key_to_coor(coor_to_key([0.3, 4.0, -1.0])), [0.3, 4.0, -1.0])
+        self.assertEqual(key_to_string(coor_to_key([0.3, 4.0, 0.0])), "0.3__4.0__0.0")
+
+        # nearly identical nodes are merged, but keep their first coordinates
+        self.shell.add_facet(
+            [[4.0, 4.0, 1e-12], [0.1 + 0.2, 4.0, 0.0], [0.0, 4.0, 0.0]],
+            {"normal": [0.0, 0.0, 1.0], "data": "more data"},
+        )
+        self.assertEqual(len(self.shell.nodes_all()), 9)
+        self.assertTrue([4.0, 4.0, 0.0] in self.shell.nodes_all())
+        self.assertEqual(len(self.shell.decompose()), 2)
+
+    def test_many_pieces(self):
+        pieces = ushell.shell()
+        for index in range(5000):
+            pieces.add_facet(
+                [[index, 0.0, 0.0], [index + 0.5, 0.0, 0.0], [index, 1.0, 0.0]],
+                {"data": index},
+            )
+        # joining the first and last pieces
+        pieces.add_facet(
+            [[0.0, 0.0, 0.0], [4999.0, 0.0, 0.0], [2000.0, 5.0, 0.0]], {"data": None}
+        )
+        new_shells = pieces.decompose()
+        self.assertEqual(len(new_shells), 4999)
+        self.assertEqual(len(new_shells[0].faces), 3)
+        self.assertEqual(new_shells[1].faces[0][1]["data"], 1)
+        self.assertEqual(new_shells[1].nodes_all()[1], [1.5, 0.0, 0.0])
+
 
 if __name__ == "__main__":
     unittest.main()
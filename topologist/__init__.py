@@ -20,7 +20,8 @@ shells, differentiated by style.
 Traces are defined using a simple directed-graph implementation,
 'topologist.ugraph', this only supports linear chains and doesn't support
 branching.  The traces contain references back to relevant Vertices,
-Faces and Cells in the original Topologic CellComplex.
+Faces and Cells in the original Topologic CellComplex.  Nodes in traces,
+hulls and normals are keyed by coordinates quantized to integer tuples.
 
 Hulls are defined using a simple faceted surface implementation,
 'topologist.ushell'.
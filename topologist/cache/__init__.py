@@ -0,0 +1,76 @@
+import functools
+import weakref
+
+# each host Topology owns a single cache, discarded along with the Topology
+caches = weakref.WeakKeyDictionary()
+
+
+class Cache:
+    """A memo of query results belonging to a single host Topology.
+    Results are retained until clear() is called, typically when the
+    host model is rebuilt or re-tagged"""
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self.data = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, function):
+        """Retrieve a result, or calculate and store it with function()"""
+        if key in self.data:
+            self.hits += 1
+            return self.data[key]
+        self.misses += 1
+        result = function()
+        if self.maxsize == None or len(self.data) < self.maxsize:
+            self.data[key] = result
+        return result
+
+    def clear(self):
+        """Forget all stored results and reset statistics"""
+        self.data = {}
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """Hit/miss statistics as a dictionary"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxsize": self.maxsize,
+            "currsize": len(self.data),
+        }
+
+
+def get_cache(topology):
+    """Retrieve the Cache owned by a Topology, creating it if necessary"""
+    if not topology in caches:
+        caches[topology] = Cache()
+    return caches[topology]
+
+
+def cached(function):
+    """Decorator, memoise a method in the Cache of the Topology it is called on"""
+
+    @functools.wraps(function)
+    def wrapper(self, *args):
+        return get_cache(self).get(
+            (function.__name__, *args), lambda: function(self, *args)
+        )
+
+    return wrapper
+
+
+def cached_by_host(function):
+    """Decorator, memoise a method(self, host_topology) in the Cache of the host"""
+
+    @functools.wraps(function)
+    def wrapper(self, host_topology):
+        if host_topology == None:
+            return function(self, host_topology)
+        return get_cache(host_topology).get(
+            (function.__name__, self), lambda: function(self, host_topology)
+        )
+
+    return wrapper
@@ -41,8 +41,7 @@ def CellsAbove(self, topology, result_cells_ptr):
     top_faces_ptr = []
     self.FacesTop(top_faces_ptr)
     for face in top_faces_ptr:
-        cells_ptr = []
-        FaceUtility.AdjacentCells(face, topology, cells_ptr)
+        cells_ptr = face.Cells_Cached(topology)
         for cell in cells_ptr:
             if not cell.IsSame(self):
                 result_cells_ptr.append(cell)
@@ -53,8 +52,7 @@ def CellsBelow(self, topology, result_cells_ptr):
     bottom_faces_ptr = []
     self.FacesBottom(bottom_faces_ptr)
     for face in bottom_faces_ptr:
-        cells_ptr = []
-        FaceUtility.AdjacentCells(face, topology, cells_ptr)
+        cells_ptr = face.Cells_Cached(topology)
         for cell in cells_ptr:
             if not cell.IsSame(self):
                 result_cells_ptr.append(cell)
@@ -119,12 +117,12 @@ def Perimeter(self, host_topology):
             if edge:
                 edges_ptr.append(Edge.ByStartVertexEndVertex(edge[0], edge[1]))
                 # process of creating a wire loses all references to original cellcomplex, stash
-                lookup[edge[0].CoorAsString() + " " + edge[1].CoorAsString()] = [
+                lookup[(edge[0].CoorAsKey(), edge[1].CoorAsKey())] = [
                     edge[0],
                     edge[1],
                     face,
                 ]
-                lookup[edge[1].CoorAsString() + " " + edge[0].CoorAsString()] = [
+                lookup[(edge[1].CoorAsKey(), edge[0].CoorAsKey())] = [
                     edge[1],
                     edge[0],
                     face,
@@ -154,9 +152,9 @@ def Perimeter(self, host_topology):
         else:
             start = vertices_ptr[i - 1]
             end = vertices_ptr[i]
-        start_coor = start.CoorAsString()
-        end_coor = end.CoorAsString()
-        refs = lookup[start_coor + " " + end_coor]
+        start_coor = start.CoorAsKey()
+        end_coor = end.CoorAsKey()
+        refs = lookup[(start_coor, end_coor)]
 
         outer_cell = None
         face = refs[2]
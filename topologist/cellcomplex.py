@@ -6,11 +6,15 @@ from topologist.helpers import el
 import topologist.traces
 import topologist.hulls
 import topologist.normals
+import topologist.index
+import topologist.grid
 
 
 def IndexTopology(self):
     """Index all cells and faces starting at zero"""
     # TODO should retain existing index numbers
+    self.CacheClear()
+    self.ClearIndex()
     cells_ptr = []
     self.Cells(None, cells_ptr)
     index = 0
@@ -28,9 +32,33 @@ def IndexTopology(self):
         index += 1
 
 
+def BuildIndex(self):
+    """Walk this CellComplex once and store integer-indexed adjacency tables,
+    subsequent neighbour queries are answered from the Index. Requires IndexTopology()"""
+    self.CacheClear()
+    topologist.index.indexes[self] = topologist.index.Index(self)
+    return topologist.index.indexes[self]
+
+
+def Index(self):
+    """The adjacency Index for this CellComplex, or None if BuildIndex() hasn't been run"""
+    return topologist.index.get_index(self)
+
+
+def ClearIndex(self):
+    """Discard any adjacency Index, call whenever this CellComplex is modified"""
+    if self in topologist.index.indexes:
+        del topologist.index.indexes[self]
+    self.CacheClear()
+
+
 def AllocateCells(self, widgets):
     """Set Cell types using a list of widgets, or default to 'living' ('void' when no Perimeter).
     A widget is any topology (typically a Vertex) with 'usage' tagged"""
+    # only test widgets with bounding boxes that overlap the cell
+    grid = topologist.grid.Grid(
+        [topologist.grid.bounding_box(widget) for widget in widgets]
+    )
     cells_ptr = []
     self.Cells(None, cells_ptr)
     for cell in cells_ptr:
@@ -39,7 +67,8 @@ def AllocateCells(self, widgets):
         if not cell.Perimeter(self).is_simple_cycle():
             cell.Set("usage", "void")
             continue
-        for widget in widgets:
+        for item in grid.query(*topologist.grid.bounding_box(cell)):
+            widget = widgets[item]
             if CellUtility.Contains(cell, widget, 0.001) == 0:
                 cell.Set("usage", widget.Get("usage").lower())
                 break
@@ -49,6 +78,8 @@ def AllocateCells(self, widgets):
     self.Faces(None, faces_ptr)
     for face in faces_ptr:
         face.BadNormal(self)
+    # usage and badnormal tags invalidate any cached classification
+    self.CacheClear()
 
 
 def Adjacency(self):
@@ -363,6 +394,9 @@ def GetHulls(self):
 
 
 setattr(topologic.CellComplex, "IndexTopology", IndexTopology)
+setattr(topologic.CellComplex, "BuildIndex", BuildIndex)
+setattr(topologic.CellComplex, "Index", Index)
+setattr(topologic.CellComplex, "ClearIndex", ClearIndex)
 setattr(topologic.CellComplex, "AllocateCells", AllocateCells)
 setattr(topologic.CellComplex, "Adjacency", Adjacency)
 setattr(topologic.CellComplex, "GetTraces", GetTraces)
@@ -35,9 +35,8 @@ def FaceAbove(self, host_topology):
 
 def FacesBelow(self, host_topology):
     """Returns a list of non-horizontal Faces attached below this Edge"""
-    faces_ptr = []
     faces_result = []
-    self.Faces(host_topology, faces_ptr)
+    faces_ptr = self.Faces_Cached(host_topology)
     for face in faces_ptr:
         if face.Centroid().Z() < self.Centroid().Z():
             faces_result.append(face)
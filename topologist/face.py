@@ -1,10 +1,10 @@
 """Overloads domain-specific methods onto topologic.Face"""
 
-from functools import lru_cache
 import math
 import topologic
 from topologic import Vertex, Edge, Face, Cluster, FaceUtility, CellUtility
 from topologist.helpers import el
+from topologist.cache import cached_by_host
 import topologist.ugraph as ugraph
 
 
@@ -27,7 +27,7 @@ def ByVertices(vertices):
 setattr(topologic.Face, "ByVertices", ByVertices)
 
 
-@lru_cache(maxsize=256)
+@cached_by_host
 def CellsOrdered(self, host_topology):
     """Front Cell and back Cell, can be [None, None]"""
     centroid = FaceUtility.InternalVertex(self, 0.001).Coordinates()
@@ -105,8 +105,8 @@ def AxisOuter(self):
     if len(edges_ptr) > 0:
         unordered = ugraph.graph()
         for edge in edges_ptr:
-            start_coor = edge.StartVertex().CoorAsString()
-            end_coor = edge.EndVertex().CoorAsString()
+            start_coor = edge.StartVertex().CoorAsKey()
+            end_coor = edge.EndVertex().CoorAsKey()
             unordered.add_edge(
                 {
                     start_coor: [
@@ -142,8 +142,8 @@ def AxisOuterTop(self):
     if len(edges_ptr) > 0:
         unordered = ugraph.graph()
         for edge in edges_ptr:
-            start_coor = edge.StartVertex().CoorAsString()
-            end_coor = edge.EndVertex().CoorAsString()
+            start_coor = edge.StartVertex().CoorAsKey()
+            end_coor = edge.EndVertex().CoorAsKey()
             unordered.add_edge(
                 {
                     start_coor: [
@@ -171,7 +171,7 @@ def AxisOuterTop(self):
             ]
 
 
-@lru_cache(maxsize=256)
+@cached_by_host
 def IsInternal(self, host_topology):
     """Is this Face between two inside Cells?"""
     cells_ptr = self.Cells_Cached(host_topology)
@@ -183,7 +183,7 @@ def IsInternal(self, host_topology):
     return False
 
 
-@lru_cache(maxsize=256)
+@cached_by_host
 def IsExternal(self, host_topology):
     """Is this Face between an inside Cell and outside Cell (or world)?"""
     cells_ptr = self.Cells_Cached(host_topology)
@@ -198,7 +198,7 @@ def IsExternal(self, host_topology):
     return False
 
 
-@lru_cache(maxsize=256)
+@cached_by_host
 def IsWorld(self, host_topology):
     """Is this Face on the outside of the mesh? i.e. does it adjoin only one Cell?"""
     cells_ptr = self.Cells_Cached(host_topology)
@@ -207,7 +207,7 @@ def IsWorld(self, host_topology):
     return False
 
 
-@lru_cache(maxsize=256)
+@cached_by_host
 def IsOpen(self, host_topology):
     """Is this Face on the outside of the mesh and adjoining an 'outside' Cell?"""
     cells_ptr = self.Cells_Cached(host_topology)
@@ -2,6 +2,8 @@
 
 import topologic
 from topologic import VertexUtility
+from topologist.cache import get_cache
+import topologist.routes
 
 
 def Circulation(self, cellcomplex):
@@ -52,67 +54,102 @@ def Circulation(self, cellcomplex):
             # neither vertical or horizontal
             vertices_ptr.append(vertex)
     self.RemoveVertices(vertices_ptr)
+    # lookup tables refer to removed Vertices
+    get_cache(self).clear()
 
 
 def IsConnected(self):
     """Checks that all Vertices can be reached from all other Vertices"""
-    connected = True
-    vertices_ptr = []
-    self.Vertices(vertices_ptr)
+    vertices_ptr, routes = self.Routes()
     if vertices_ptr:
-        vertex_a = vertices_ptr[0]
-        for vertex_b in vertices_ptr:
-            if vertex_b.Get("class") == "Face":
-                continue
-            if vertex_a.IsSame(vertex_b):
+        labels = routes.components()
+        for node in range(len(vertices_ptr)):
+            if vertices_ptr[node].Get("class") == "Face":
                 continue
-            distance = self.TopologicalDistance(vertex_a, vertex_b)
-            if distance > 255:
-                connected = False
-    return connected
+            if not labels[node] == labels[0]:
+                return False
+    return True
+
+
+def Components(self):
+    """Connected groups of Cell Vertices, as a list of lists, largest first"""
+    vertices_ptr, routes = self.Routes()
+    labels = routes.components()
+    components = {}
+    for node in range(len(vertices_ptr)):
+        if vertices_ptr[node].Get("class") == "Cell":
+            if not labels[node] in components:
+                components[labels[node]] = []
+            components[labels[node]].append(vertices_ptr[node])
+    return sorted(components.values(), key=len, reverse=True)
+
+
+def UnreachableCells(self):
+    """Cell Vertices that can't be reached from the largest connected group"""
+    result = []
+    for component in self.Components()[1:]:
+        result.extend(component)
+    return result
 
 
 def ShortestPathTable(self):
-    """Calculates shortest path distance between all pairs of cells and returns a lookup table"""
+    """Calculates shortest path distance between all pairs of cells and returns a lookup table.
+    Cells are only included with other cells that they are connected to"""
     result = {}
-    if self.IsConnected():
+    vertices_ptr, routes = self.Routes()
+    sources = [
+        node
+        for node in range(len(vertices_ptr))
+        if vertices_ptr[node].Get("class") == "Cell"
+    ]
+    indices = {node: vertices_ptr[node].Get("index") for node in sources}
+    table = routes.table(sources)
+    for node_a in table:
+        # skip cells that are isolated
+        if not table[node_a]:
+            continue
+        result[indices[node_a]] = {
+            indices[node_b]: length for node_b, length in table[node_a].items()
+        }
+    return result
+
+
+def Routes(self):
+    """Export this Graph as a list of Vertices and a Routes path-finding
+    object weighted by Edge length, Routes nodes are positions in the list"""
+
+    def build():
         vertices_ptr = []
         self.Vertices(vertices_ptr)
-        vertices_list = []
-        for vertex in vertices_ptr:
-            if vertex.Get("class") == "Cell":
-                vertices_list.append(vertex)
-        for i in range(len(vertices_list)):
-            for j in range(len(vertices_list)):
-                if j <= i:
-                    continue
-                wire = self.ShortestPath(
-                    vertices_list[i], vertices_list[j], "", "length"
-                )
-                edges_ptr = []
-                wire.Edges(None, edges_ptr)
-                length = 0.0
-                for edge in edges_ptr:
-                    length += edge.Length()
-                i_index = vertices_list[i].Get("index")
-                j_index = vertices_list[j].Get("index")
-                if not i_index in result:
-                    result[i_index] = {}
-                if not j_index in result:
-                    result[j_index] = {}
-                result[i_index][j_index] = length
-                result[j_index][i_index] = length
-    return result
+        lookup = {}
+        for node in range(len(vertices_ptr)):
+            lookup[tuple(vertices_ptr[node].Coordinates())] = node
+        edges_ptr = []
+        self.Edges(edges_ptr)
+        edges = [
+            [
+                lookup[tuple(edge.StartVertex().Coordinates())],
+                lookup[tuple(edge.EndVertex().Coordinates())],
+                edge.Length(),
+            ]
+            for edge in edges_ptr
+        ]
+        return vertices_ptr, topologist.routes.Routes(len(vertices_ptr), edges)
+
+    return get_cache(self).get(("Routes",), build)
 
 
 def Separation(self, table, cellcomplex):
-    """Tags 'cell' vertices with average travel distance to all other cells"""
+    """Tags 'cell' vertices with average travel distance to all other connected cells"""
     if table:
         vertices_ptr = []
         self.Vertices(vertices_ptr)
         for vertex in vertices_ptr:
             if vertex.Get("class") == "Cell":
                 index = vertex.Get("index")
+                if not index in table:
+                    # this cell isn't connected to any other
+                    continue
                 total_length = 0.0
                 for length in table[index].values():
                     total_length += length
@@ -123,11 +160,9 @@ def Separation(self, table, cellcomplex):
 
 def Faces(self, cellcomplex):
     """Return all the Faces from a CellComplex corresponding to this Graph"""
-    vertices_ptr = []
-    self.Vertices(vertices_ptr)
     faces_ptr = []
-    for vertex in vertices_ptr:
-        if vertex.Get("class") == "Face":
+    for (myclass, index), vertex in self.VertexLookup().items():
+        if myclass == "Face":
             face = self.GetEntity(cellcomplex, vertex)
             faces_ptr.append(face)
     return faces_ptr
@@ -135,11 +170,9 @@ def Faces(self, cellcomplex):
 
 def Cells(self, cellcomplex):
     """Return all the Cells from a CellComplex corresponding to this Graph"""
-    vertices_ptr = []
-    self.Vertices(vertices_ptr)
     cells_ptr = []
-    for vertex in vertices_ptr:
-        if vertex.Get("class") == "Cell":
+    for (myclass, index), vertex in self.VertexLookup().items():
+        if myclass == "Cell":
             cell = self.GetEntity(cellcomplex, vertex)
             cells_ptr.append(cell)
     return cells_ptr
@@ -148,17 +181,42 @@ def Cells(self, cellcomplex):
 def GetEntity(self, cellcomplex, vertex):
     """Return the entity from a CellComplex (Face or Cell) corresponding to this Vertex)"""
     index = vertex.Get("index")
-    if vertex.Get("class") == "Face":
-        topologies_ptr = []
-        cellcomplex.Faces(None, topologies_ptr)
-    elif vertex.Get("class") == "Cell":
-        topologies_ptr = []
-        cellcomplex.Cells(None, topologies_ptr)
-    else:
+    myclass = vertex.Get("class")
+    if not myclass in ("Face", "Cell"):
         return None
-    for entity in topologies_ptr:
-        if entity.Get("index") == index:
-            return entity
+    return entity_lookup(cellcomplex).get((myclass, index))
+
+
+def VertexLookup(self):
+    """A (class, index) -> Vertex dictionary for this Graph, built once"""
+
+    def build():
+        lookup = {}
+        vertices_ptr = []
+        self.Vertices(vertices_ptr)
+        for vertex in vertices_ptr:
+            lookup[(vertex.Get("class"), vertex.Get("index"))] = vertex
+        return lookup
+
+    return get_cache(self).get(("VertexLookup",), build)
+
+
+def entity_lookup(cellcomplex):
+    """A (class, index) -> Face or Cell dictionary for a CellComplex, built once"""
+
+    def build():
+        lookup = {}
+        faces_ptr = []
+        cellcomplex.Faces(None, faces_ptr)
+        for face in faces_ptr:
+            lookup[("Face", face.Get("index"))] = face
+        cells_ptr = []
+        cellcomplex.Cells(None, cells_ptr)
+        for cell in cells_ptr:
+            lookup[("Cell", cell.Get("index"))] = cell
+        return lookup
+
+    return cellcomplex.Cache().get(("EntityLookup",), build)
 
 
 # FIXME doesn't appear to be in use
@@ -187,9 +245,13 @@ def Dot(self, cellcomplex):
 
 setattr(topologic.Graph, "Circulation", Circulation)
 setattr(topologic.Graph, "IsConnected", IsConnected)
+setattr(topologic.Graph, "Components", Components)
+setattr(topologic.Graph, "UnreachableCells", UnreachableCells)
 setattr(topologic.Graph, "ShortestPathTable", ShortestPathTable)
+setattr(topologic.Graph, "Routes", Routes)
 setattr(topologic.Graph, "Separation", Separation)
 setattr(topologic.Graph, "Faces", Faces)
 setattr(topologic.Graph, "Cells", Cells)
 setattr(topologic.Graph, "GetEntity", GetEntity)
+setattr(topologic.Graph, "VertexLookup", VertexLookup)
 setattr(topologic.Graph, "Dot", Dot)
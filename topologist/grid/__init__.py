@@ -0,0 +1,94 @@
+import math
+import topologic
+
+
+class Grid:
+    """A uniform grid of buckets indexing items by axis-aligned bounding box.
+    Items are integers, typically positions in a list of Topologies, queries
+    return only those items with boxes that overlap the query box"""
+
+    def __init__(self, boxes, tolerance=0.001):
+        """boxes is a list of [[xmin, ymin, zmin], [xmax, ymax, zmax]] pairs"""
+        self.tolerance = tolerance
+        self.boxes = [
+            [
+                [value - tolerance for value in box[0]],
+                [value + tolerance for value in box[1]],
+            ]
+            for box in boxes
+        ]
+        self.size = bucket_size(self.boxes)
+        self.buckets = {}
+        for item in range(len(self.boxes)):
+            for key in self.keys(*self.boxes[item]):
+                if not key in self.buckets:
+                    self.buckets[key] = []
+                self.buckets[key].append(item)
+
+    def ranges(self, lo, hi):
+        """Ranges of bucket keys along each axis covered by a box"""
+        return [
+            range(
+                math.floor(lo[axis] / self.size), math.floor(hi[axis] / self.size) + 1
+            )
+            for axis in range(3)
+        ]
+
+    def keys(self, lo, hi):
+        """Bucket keys covered by a box"""
+        ranges = self.ranges(lo, hi)
+        return [(x, y, z) for x in ranges[0] for y in ranges[1] for z in ranges[2]]
+
+    def query(self, lo, hi=None):
+        """Items with boxes overlapping a box (or a point), in ascending order"""
+        if hi == None:
+            hi = lo
+        ranges = self.ranges(lo, hi)
+        if len(ranges[0]) * len(ranges[1]) * len(ranges[2]) > len(self.boxes):
+            # a large query box covers more buckets than there are items
+            candidates = range(len(self.boxes))
+        else:
+            candidates = set()
+            for key in self.keys(lo, hi):
+                candidates.update(self.buckets.get(key, []))
+        return sorted(
+            item for item in candidates if overlaps(self.boxes[item], [lo, hi])
+        )
+
+
+def bucket_size(boxes):
+    """Choose a bucket size, the average of the largest extent of each box.
+    Points have no extent, so buckets are at least large enough to divide the
+    overall extent into roughly as many buckets as there are boxes"""
+    if not boxes:
+        return 1.0
+    total = 0.0
+    for lo, hi in boxes:
+        total += max(hi[axis] - lo[axis] for axis in range(3))
+    extent = max(
+        max(box[1][axis] for box in boxes) - min(box[0][axis] for box in boxes)
+        for axis in range(3)
+    )
+    return max(total / len(boxes), extent / math.ceil(len(boxes) ** (1 / 3)), 0.001)
+
+
+def overlaps(box_a, box_b):
+    """Do two boxes touch or intersect"""
+    for axis in range(3):
+        if box_a[0][axis] > box_b[1][axis] or box_b[0][axis] > box_a[1][axis]:
+            return False
+    return True
+
+
+def bounding_box(topology):
+    """Axis-aligned [[xmin, ymin, zmin], [xmax, ymax, zmax]] of a Topology"""
+    if type(topology) == topologic.Vertex:
+        coordinates = [topology.Coordinates()]
+    else:
+        vertices_ptr = []
+        topology.Vertices(None, vertices_ptr)
+        coordinates = [vertex.Coordinates() for vertex in vertices_ptr]
+    return [
+        [min(coor[axis] for coor in coordinates) for axis in range(3)],
+        [max(coor[axis] for coor in coordinates) for axis in range(3)],
+    ]
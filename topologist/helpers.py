@@ -6,3 +6,27 @@ def el(elevation):
 
 def string_to_coor(string):
     return [float(num) for num in string.split("__")]
+
+
+# coordinate keys count multiples of 1 / KEY_SCALE, i.e. the 0.1mm model tolerance
+KEY_SCALE = 10000
+
+
+def coor_to_key(coor):
+    """A hashable key for a 3D coordinate, a tuple of integers quantized to
+    the model tolerance. Unlike strings, nearly identical coordinates share a key"""
+    return (
+        round(coor[0] * KEY_SCALE),
+        round(coor[1] * KEY_SCALE),
+        round(coor[2] * KEY_SCALE),
+    )
+
+
+def key_to_coor(key):
+    """Quantized coordinates of a key made by coor_to_key()"""
+    return [value / KEY_SCALE for value in key]
+
+
+def key_to_string(key):
+    """Stringify a coordinate key, for names and debugging"""
+    return "__".join(str(value) for value in key_to_coor(key))
@@ -0,0 +1,173 @@
+import weakref
+import topologic
+
+# each CellComplex owns at most one Index, discarded along with the CellComplex
+indexes = weakref.WeakKeyDictionary()
+
+
+class Index:
+    """Integer-indexed adjacency tables for a CellComplex, walked once.
+    Faces and Cells are numbered by their 'index' Dictionary attribute,
+    Edges and Vertices are numbered in order of discovery"""
+
+    def __init__(self, cellcomplex):
+        self.faces = []
+        self.cells = []
+        self.edges = []
+        self.vertices = []
+        self.face_cells = []
+        self.cell_faces = []
+        self.edge_faces = []
+        self.vertex_edges = []
+        self.edge_lookup = {}
+        self.vertex_lookup = {}
+
+        faces_ptr = []
+        cellcomplex.Faces(None, faces_ptr)
+        self.faces = [None] * len(faces_ptr)
+        for face in faces_ptr:
+            self.faces[int(face.Get("index"))] = face
+        self.face_cells = [[] for _ in self.faces]
+
+        cells_ptr = []
+        cellcomplex.Cells(None, cells_ptr)
+        self.cells = [None] * len(cells_ptr)
+        for cell in cells_ptr:
+            self.cells[int(cell.Get("index"))] = cell
+        self.cell_faces = [[] for _ in self.cells]
+
+        for cell_id in range(len(self.cells)):
+            cell_faces_ptr = []
+            self.cells[cell_id].Faces(None, cell_faces_ptr)
+            for face in cell_faces_ptr:
+                face_id = int(face.Get("index"))
+                self.cell_faces[cell_id].append(face_id)
+                self.face_cells[face_id].append(cell_id)
+
+        for face_id in range(len(self.faces)):
+            edges_ptr = []
+            self.faces[face_id].Edges(None, edges_ptr)
+            for edge in edges_ptr:
+                key = edge_key(edge)
+                if not key in self.edge_lookup:
+                    edge_id = len(self.edges)
+                    self.edge_lookup[key] = edge_id
+                    self.edges.append(edge)
+                    self.edge_faces.append([])
+                    for vertex in [edge.StartVertex(), edge.EndVertex()]:
+                        vertex_id = self.vertex_id(vertex, create=True)
+                        self.vertex_edges[vertex_id].append(edge_id)
+                self.edge_faces[self.edge_lookup[key]].append(face_id)
+
+    def vertex_id(self, vertex, create=False):
+        """Integer id for a Vertex, or None if not in this Index"""
+        key = tuple(vertex.Coordinates())
+        if not key in self.vertex_lookup:
+            if not create:
+                return None
+            self.vertex_lookup[key] = len(self.vertices)
+            self.vertices.append(vertex)
+            self.vertex_edges.append([])
+        return self.vertex_lookup[key]
+
+    def edge_id(self, edge):
+        """Integer id for an Edge, or None if not in this Index"""
+        return self.edge_lookup.get(edge_key(edge))
+
+    def face_id(self, face):
+        """Integer id for a Face, or None if not in this Index"""
+        return topology_id(face, "Face", self.faces)
+
+    def cell_id(self, cell):
+        """Integer id for a Cell, or None if not in this Index"""
+        return topology_id(cell, "Cell", self.cells)
+
+    def face_ids(self, topology):
+        """Integer ids of Faces attached to a Topology, or None if not indexed"""
+        if type(topology) == topologic.Face:
+            face_id = self.face_id(topology)
+            if face_id == None:
+                return None
+            return [face_id]
+        elif type(topology) == topologic.Cell:
+            cell_id = self.cell_id(topology)
+            if cell_id == None:
+                return None
+            return self.cell_faces[cell_id]
+        elif type(topology) == topologic.Edge:
+            edge_id = self.edge_id(topology)
+            if edge_id == None:
+                return None
+            return self.edge_faces[edge_id]
+        elif type(topology) == topologic.Vertex:
+            vertex_id = self.vertex_id(topology)
+            if vertex_id == None:
+                return None
+            return unique(
+                [
+                    face_id
+                    for edge_id in self.vertex_edges[vertex_id]
+                    for face_id in self.edge_faces[edge_id]
+                ]
+            )
+        return None
+
+    def cell_ids(self, topology):
+        """Integer ids of Cells attached to a Topology, or None if not indexed"""
+        if type(topology) == topologic.Cell:
+            cell_id = self.cell_id(topology)
+            if cell_id == None:
+                return None
+            return [cell_id]
+        face_ids = self.face_ids(topology)
+        if face_ids == None:
+            return None
+        return unique(
+            [cell_id for face_id in face_ids for cell_id in self.face_cells[face_id]]
+        )
+
+    def Faces(self, topology):
+        """List of Faces attached to a Topology, or None if not indexed"""
+        face_ids = self.face_ids(topology)
+        if face_ids == None:
+            return None
+        return [self.faces[face_id] for face_id in face_ids]
+
+    def Cells(self, topology):
+        """List of Cells attached to a Topology, or None if not indexed"""
+        cell_ids = self.cell_ids(topology)
+        if cell_ids == None:
+            return None
+        return [self.cells[cell_id] for cell_id in cell_ids]
+
+
+def edge_key(edge):
+    """Edges are identified by their end coordinates, in either direction"""
+    return frozenset(
+        [tuple(edge.StartVertex().Coordinates()), tuple(edge.EndVertex().Coordinates())]
+    )
+
+
+def topology_id(topology, myclass, topologies):
+    """Integer 'index' attribute of a Face or Cell, or None if not in the list"""
+    if not topology.Get("class") == myclass:
+        return None
+    index = topology.Get("index")
+    if index == None or not int(index) < len(topologies):
+        return None
+    # index numbers are only unique within a single CellComplex
+    if not topologies[int(index)].IsSame(topology):
+        return None
+    return int(index)
+
+
+def unique(ids):
+    """Remove duplicate ids preserving order"""
+    return list(dict.fromkeys(ids))
+
+
+def get_index(topology):
+    """Retrieve the Index owned by a Topology, or None"""
+    if topology == None or not topology in indexes:
+        return None
+    return indexes[topology]
@@ -0,0 +1,55 @@
+import numpy
+
+# coordinates closer than this are merged into a single mesh vertex
+TOLERANCE = 0.0001
+
+
+class Mesh:
+    """A pool of vertices shared by many Faces. Vertex coordinates are rounded
+    to the tolerance and hashed, so each lookup is a single dictionary access"""
+
+    def __init__(self, tolerance=TOLERANCE):
+        self.tolerance = tolerance
+        self.lookup = {}
+        self.coordinates = []
+        self.faces = []
+
+    def vertex_id(self, coor):
+        """Integer id for a coordinate, adding it to the pool if necessary"""
+        key = (
+            round(coor[0] / self.tolerance),
+            round(coor[1] / self.tolerance),
+            round(coor[2] / self.tolerance),
+        )
+        if not key in self.lookup:
+            self.lookup[key] = len(self.coordinates)
+            self.coordinates.append(coor)
+        return self.lookup[key]
+
+    def add_face(self, face):
+        """Add the outer boundary of a Face, returns the list of vertex ids"""
+        vertices_ptr = []
+        face.ExternalBoundary().Vertices(None, vertices_ptr)
+        ids = [self.vertex_id(vertex.Coordinates()) for vertex in vertices_ptr]
+        self.faces.append(ids)
+        return ids
+
+    def add_faces(self, faces_ptr):
+        """Add a list of Faces, returns a list of vertex id lists"""
+        return [self.add_face(face) for face in faces_ptr]
+
+    def vertices(self):
+        """Pooled vertex coordinates as a (n, 3) NumPy array"""
+        return numpy.array(self.coordinates, dtype=float).reshape(-1, 3)
+
+    def arrays(self):
+        """Vertex coordinates and Faces as NumPy arrays, Faces are a list of
+        integer arrays since they may have differing numbers of vertices"""
+        return self.vertices(), [numpy.array(ids, dtype=int) for ids in self.faces]
+
+
+def mesh_faces(faces_ptr, tolerance=TOLERANCE):
+    """Mesh a list of Faces against one shared vertex pool, returns NumPy arrays"""
+    mesh = Mesh(tolerance)
+    mesh.add_faces(faces_ptr)
+    return mesh.arrays()
@@ -1,13 +1,21 @@
 import numpy
-from topologist.helpers import el
+from topologist.helpers import el, coor_to_key
 
 
 class Normals:
     """Normals are unit vectors indicating the local vertex orientation.
-    Here they are used to tell walls and extrusions how to mitre properly."""
+    Here they are used to tell walls and extrusions how to mitre properly.
+    Vectors are collected in arrays and summed for each vertex by process(),
+    results are then available as dictionaries of vectors in 'normals'"""
 
-    def __init__(self):
+    def __init__(self, capacity=1024):
         self.normals = {"bottom": {}, "top": {}}
+        # a row number for each label and vertex key
+        self.groups = {}
+        # added vectors, and the row each is to be summed into
+        self.vectors = numpy.empty((capacity, 3), dtype=float)
+        self.rows = numpy.empty(capacity, dtype=int)
+        self.count = 0
 
     def add_vector(self, label, vertex, vector):
         """Add a 3D vector to the location defined by a Topologic Vertex"""
@@ -15,25 +23,28 @@ class Normals:
             self.normals[label] = {}
 
         if vertex.__class__ == [].__class__:
-            vertex_str = (
-                str(vertex[0]) + "__" + str(vertex[1]) + "__" + str(el(vertex[2]))
-            )
+            key = coor_to_key([vertex[0], vertex[1], el(vertex[2])])
         else:
-            vertex_str = (
-                str(vertex.X()) + "__" + str(vertex.Y()) + "__" + str(el(vertex.Z()))
-            )
+            key = coor_to_key([vertex.X(), vertex.Y(), el(vertex.Z())])
 
-        if vertex_str in self.normals[label]:
-            self.normals[label][vertex_str] = numpy.add(
-                self.normals[label][vertex_str], vector
+        group = (label, key)
+        if not group in self.groups:
+            self.groups[group] = len(self.groups)
+
+        if self.count == len(self.rows):
+            # full, double the size of the arrays
+            self.vectors = numpy.concatenate(
+                [self.vectors, numpy.empty_like(self.vectors)]
             )
-        else:
-            self.normals[label][vertex_str] = vector
+            self.rows = numpy.concatenate([self.rows, numpy.empty_like(self.rows)])
+        self.vectors[self.count] = vector
+        self.rows[self.count] = self.groups[group]
+        self.count += 1
 
     def process(self):
-        """add_vector() increments the magnitude, normalise to 1.0"""
-        for label in self.normals:
-            for vertex_str in self.normals[label]:
-                self.normals[label][vertex_str] /= numpy.linalg.norm(
-                    self.normals[label][vertex_str]
-                )
+        """Sum vectors added at each location with add_vector(), normalise to 1.0"""
+        sums = numpy.zeros((len(self.groups), 3), dtype=float)
+        numpy.add.at(sums, self.rows[: self.count], self.vectors[: self.count])
+        sums /= numpy.linalg.norm(sums, axis=1)[:, numpy.newaxis]
+        for (label, key), row in self.groups.items():
+            self.normals[label][key] = sums[row]
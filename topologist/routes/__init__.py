@@ -0,0 +1,79 @@
+import heapq
+
+
+class Routes:
+    """A compact undirected weighted graph for path-finding, nodes are
+    integers, adjacency is stored as compressed sparse row arrays"""
+
+    def __init__(self, size, edges):
+        """edges is a list of [node_a, node_b, weight] triples"""
+        self.size = size
+        degrees = [0] * size
+        for edge in edges:
+            degrees[edge[0]] += 1
+            degrees[edge[1]] += 1
+        self.indptr = [0] * (size + 1)
+        for node in range(size):
+            self.indptr[node + 1] = self.indptr[node] + degrees[node]
+        self.indices = [0] * self.indptr[size]
+        self.weights = [0.0] * self.indptr[size]
+        fill = self.indptr[:-1]
+        for node_a, node_b, weight in edges:
+            for start, end in ((node_a, node_b), (node_b, node_a)):
+                self.indices[fill[start]] = end
+                self.weights[fill[start]] = weight
+                fill[start] += 1
+
+    def neighbours(self, node):
+        """Nodes directly connected to this node"""
+        return self.indices[self.indptr[node] : self.indptr[node + 1]]
+
+    def components(self):
+        """Label every node with the id of its connected component, visiting
+        each node once. Returns a list of component ids"""
+        labels = [None] * self.size
+        label = 0
+        for start in range(self.size):
+            if labels[start] != None:
+                continue
+            labels[start] = label
+            queue = [start]
+            while queue:
+                node = queue.pop()
+                for other in self.neighbours(node):
+                    if labels[other] == None:
+                        labels[other] = label
+                        queue.append(other)
+            label += 1
+        return labels
+
+    def dijkstra(self, source):
+        """Shortest weighted distance from source to every node, None if unreachable"""
+        distances = [None] * self.size
+        distances[source] = 0.0
+        done = [False] * self.size
+        queue = [(0.0, source)]
+        while queue:
+            distance, node = heapq.heappop(queue)
+            if done[node]:
+                continue
+            done[node] = True
+            for position in range(self.indptr[node], self.indptr[node + 1]):
+                other = self.indices[position]
+                candidate = distance + self.weights[position]
+                if distances[other] == None or candidate < distances[other]:
+                    distances[other] = candidate
+                    heapq.heappush(queue, (candidate, other))
+        return distances
+
+    def table(self, sources):
+        """Shortest distances between all pairs of source nodes, as a nested dictionary"""
+        result = {}
+        for source in sources:
+            distances = self.dijkstra(source)
+            result[source] = {
+                target: distances[target]
+                for target in sources
+                if target != source and distances[target] != None
+            }
+        return result
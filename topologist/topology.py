@@ -1,30 +1,58 @@
 """Overloads domain-specific methods onto topologic.Topology"""
 
-from functools import lru_cache
 import topologic
 from topologic import StringAttribute, Vertex, FaceUtility
 from topologist.helpers import el
+from topologist.cache import cached, cached_by_host, get_cache
+from topologist.index import get_index
 import topologist.traces
 import topologist.hulls
 import topologist.normals
+import topologist.mesh
+import topologist.grid
 
 
-@lru_cache(maxsize=256)
+@cached_by_host
 def Cells_Cached(self, host_topology):
     """List of Cells directly attached to this Topology"""
+    index = get_index(host_topology)
+    if index:
+        cells_ptr = index.Cells(self)
+        if cells_ptr != None:
+            return cells_ptr
     cells_ptr = []
     self.Cells(host_topology, cells_ptr)
     return cells_ptr
 
 
-@lru_cache(maxsize=256)
+@cached_by_host
 def Faces_Cached(self, host_topology):
     """List of Faces directly attached to this Topology"""
+    index = get_index(host_topology)
+    if index:
+        faces_ptr = index.Faces(self)
+        if faces_ptr != None:
+            return faces_ptr
     faces_ptr = []
     self.Faces(host_topology, faces_ptr)
     return faces_ptr
 
 
+def Cache(self):
+    """The query Cache owned by this Topology"""
+    return get_cache(self)
+
+
+def CacheInfo(self):
+    """Hit/miss statistics for the query Cache owned by this Topology"""
+    return get_cache(self).info()
+
+
+def CacheClear(self):
+    """Invalidate cached query results, call whenever this model is rebuilt"""
+    get_cache(self).clear()
+
+
 def FacesVertical(self, faces_ptr):
     """List of vertical Faces within this Topology"""
     elements_ptr = []
@@ -66,7 +94,7 @@ def FacesWorld(self, host_topology):
     return faces_ptr
 
 
-@lru_cache(maxsize=256)
+@cached
 def Elevation(self):
     """Lowest Z-height in this Topology"""
     lowest = 9999999.9
@@ -78,7 +106,7 @@ def Elevation(self):
     return el(lowest)
 
 
-@lru_cache(maxsize=256)
+@cached
 def Height(self):
     """Vertical distance between the lowest and highest points in this Topology"""
     highest = -9999999.9
@@ -92,18 +120,18 @@ def Height(self):
 
 def Mesh(self):
     """Returns a list of Vertex coordinates, and a list of indexed Faces"""
-    vertices_ptr = []
-    self.Vertices(None, vertices_ptr)
-    vertices = [vertex.Coordinates() for vertex in vertices_ptr]
+    faces_ptr = []
+    self.Faces(None, faces_ptr)
+    mesh = topologist.mesh.Mesh()
+    mesh.add_faces(faces_ptr)
+    return mesh.coordinates, mesh.faces
+
 
+def MeshArrays(self):
+    """Returns Vertex coordinates as a NumPy array, and a list of indexed Faces as arrays"""
     faces_ptr = []
     self.Faces(None, faces_ptr)
-    faces = []
-    for face in faces_ptr:
-        wire_vertices_ptr = []
-        face.ExternalBoundary().Vertices(None, wire_vertices_ptr)
-        faces.append([self.VertexId(vertex) for vertex in wire_vertices_ptr])
-    return vertices, faces
+    return topologist.mesh.mesh_faces(faces_ptr)
 
 
 def Set(self, key, value):
@@ -140,14 +168,10 @@ def GraphVertex(self, graph):
     index = self.Get("index")
     myclass = type(self).__name__
     if not index == None:
-        vertices_ptr = []
-        graph.Vertices(vertices_ptr)
-        for vertex in vertices_ptr:
-            if vertex.Get("index") == index and vertex.Get("class") == myclass:
-                return vertex
+        return graph.VertexLookup().get((myclass, index))
 
 
-@lru_cache(maxsize=256)
+@cached
 def VertexId(self, vertex):
     i = 0
     vertices_ptr = []
@@ -160,11 +184,17 @@ def VertexId(self, vertex):
 
 def ApplyDictionary(self, source_faces_ptr):
     """Copy Dictionary items from a list of Faces onto this CellComplex"""
+    self.CacheClear()
     faces_ptr = []
     self.Faces(None, faces_ptr)
+    # only test source faces with bounding boxes that contain the vertex
+    grid = topologist.grid.Grid(
+        [topologist.grid.bounding_box(source_face) for source_face in source_faces_ptr]
+    )
     for face in faces_ptr:
         vertex = FaceUtility.InternalVertex(face, 0.001)
-        for source_face in source_faces_ptr:
+        for item in grid.query(vertex.Coordinates()):
+            source_face = source_faces_ptr[item]
             if FaceUtility.IsInside(source_face, vertex, 0.001):
                 dictionary = source_face.GetDictionary()
                 for key in dictionary.Keys():
@@ -175,6 +205,7 @@ def ApplyDictionary(self, source_faces_ptr):
 def IndexTopology(self):
     """Index all faces starting at zero"""
     # TODO should retain existing index numbers
+    self.CacheClear()
     faces_ptr = []
     self.Faces(None, faces_ptr)
     index = 0
@@ -338,6 +369,9 @@ def GetHulls(self):
 
 setattr(topologic.Topology, "Cells_Cached", Cells_Cached)
 setattr(topologic.Topology, "Faces_Cached", Faces_Cached)
+setattr(topologic.Topology, "Cache", Cache)
+setattr(topologic.Topology, "CacheInfo", CacheInfo)
+setattr(topologic.Topology, "CacheClear", CacheClear)
 setattr(topologic.Topology, "FacesVertical", FacesVertical)
 setattr(topologic.Topology, "FacesHorizontal", FacesHorizontal)
 setattr(topologic.Topology, "FacesInclined", FacesInclined)
@@ -345,6 +379,7 @@ setattr(topologic.Topology, "FacesWorld", FacesWorld)
 setattr(topologic.Topology, "Elevation", Elevation)
 setattr(topologic.Topology, "Height", Height)
 setattr(topologic.Topology, "Mesh", Mesh)
+setattr(topologic.Topology, "MeshArrays", MeshArrays)
 setattr(topologic.Topology, "Set", Set)
 setattr(topologic.Topology, "Get", Get)
 setattr(topologic.Topology, "DumpDictionary", DumpDictionary)
@@ -32,8 +32,8 @@ class Traces:
 
         traces[label][elevation][height][stylename].add_edge(
             {
-                start_vertex.CoorAsString(): [
-                    end_vertex.CoorAsString(),
+                start_vertex.CoorAsKey(): [
+                    end_vertex.CoorAsKey(),
                     {
                         "start_vertex": start_vertex,
                         "end_vertex": end_vertex,
@@ -61,8 +61,8 @@ class Traces:
         graph = ugraph.graph()
         graph.add_edge(
             {
-                start_vertex.CoorAsString(): [
-                    end_vertex.CoorAsString(),
+                start_vertex.CoorAsKey(): [
+                    end_vertex.CoorAsKey(),
                     {
                         "start_vertex": start_vertex,
                         "end_vertex": end_vertex,
@@ -50,56 +50,58 @@ class graph:
 
     def source_vertices(self):
         """Return a list of starting nodes that are not ends"""
-        result = []
-        start_list = self.starts()
-        end_list = self.ends()
-        for start in start_list:
-            if not start in end_list:
-                result.append(start)
-        return result
+        end_set = set(self.ends())
+        return [start for start in self.graph if not start in end_set]
+
+    def successors(self):
+        """Nodes interned as integer positions in a list, returns the list and
+        for each node the position of the next node, or None if it is an end"""
+        nodes = list(self.graph)
+        ids = {node: position for position, node in enumerate(nodes)}
+        return nodes, [ids.get(self.graph[node][0]) for node in nodes]
+
+    def walk(self, nodes, successors, visited, position):
+        """Follow edges from a node until an end or a visited node is reached,
+        returns the path as a new graph object"""
+        path = graph()
+        while position != None and not visited[position]:
+            visited[position] = True
+            node = nodes[position]
+            path.graph[node] = self.graph[node]
+            position = successors[position]
+        return path
+
+    def paths(self):
+        """Return open chains and closed cycles as two lists of new graph
+        objects, each node is visited once and this graph is unchanged"""
+        nodes, successors = self.successors()
+        in_degree = [0] * len(nodes)
+        for position in successors:
+            if position != None:
+                in_degree[position] += 1
+        visited = [False] * len(nodes)
+        chains = [
+            self.walk(nodes, successors, visited, position)
+            for position in range(len(nodes))
+            if in_degree[position] == 0
+        ]
+        # everything not reachable from a source is part of a cycle
+        cycles = [
+            self.walk(nodes, successors, visited, position)
+            for position in range(len(nodes))
+            if not visited[position]
+        ]
+        return chains, cycles
 
     def find_chains(self):
-        """Return a list of open chains as new graph objects.
-        Results are removed from this graph"""
-        result = []
-        source_list = self.source_vertices()
-        for vertex in source_list:
-            chain = graph()
-            todo = True
-            while todo == True:
-                chain.add_edge({vertex: self.graph[vertex]})
-                if self.graph[vertex][0] in self.graph:
-                    vertex_next = self.graph[vertex][0]
-                    self.graph[vertex] = False
-                    vertex = vertex_next
-                else:
-                    self.graph[vertex] = False
-                    todo = False
-            result.append(chain)
-        return result
+        """Return a list of open chains as new graph objects"""
+        return self.paths()[0]
 
     def find_cycles(self):
-        """Return a list of closed cycles as new graph objects.
-        Results are removed from this graph. This method assumes
-        that find_chains() has already been run"""
-        result = []
-        for vertex in self.graph:
-            if not self.graph[vertex]:
-                continue
-            cycle = graph()
-            todo = True
-            while todo == True:
-                if self.graph[vertex] and self.graph[vertex][0] in self.graph:
-                    cycle.add_edge({vertex: self.graph[vertex]})
-                    vertex_next = self.graph[vertex][0]
-                    self.graph[vertex] = False
-                    vertex = vertex_next
-                else:
-                    self.graph[vertex] = False
-                    todo = False
-            result.append(cycle)
-        return result
+        """Return a list of closed cycles as new graph objects"""
+        return self.paths()[1]
 
     def find_paths(self):
         """Return result of find_chains() and find_cycles() as a single list"""
-        return self.find_chains() + self.find_cycles()
+        chains, cycles = self.paths()
+        return chains + cycles
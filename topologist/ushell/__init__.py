@@ -1,4 +1,4 @@
-from topologist.helpers import string_to_coor
+from topologist.helpers import coor_to_key
 
 
 class shell:
@@ -9,61 +9,66 @@ class shell:
     # objects such as Topologic Cells and Faces in the CellComplex
 
     def __init__(self):
+        # faces using each node, nodes are keyed by quantized coordinates
         self.nodes = {}
+        # coordinates of each node, as first added
+        self.coordinates = {}
         self.faces = []
 
     def add_facet(self, node_coors, data):
         """add a face to this shell"""
-        nodes_str = [
-            str(node[0]) + "__" + str(node[1]) + "__" + str(node[2])
-            for node in node_coors
-        ]
-        my_face = [nodes_str, data, None]
-        self.faces.append(my_face)
+        keys = [coor_to_key(node) for node in node_coors]
         for index in range(len(node_coors)):
-            if not nodes_str[index] in self.nodes:
-                self.nodes[nodes_str[index]] = []
-            self.nodes[nodes_str[index]].append(my_face)
+            if not keys[index] in self.coordinates:
+                self.coordinates[keys[index]] = list(node_coors[index])
+        self.add_keys(keys, data)
+
+    def add_keys(self, keys, data):
+        """add a face given keys of nodes that already have coordinates"""
+        my_face = [keys, data, None]
+        self.faces.append(my_face)
+        for key in keys:
+            if not key in self.nodes:
+                self.nodes[key] = []
+            self.nodes[key].append(my_face)
 
     # FIXME doesn't appear to be in use
     def nodes_all(self):
         """get a list of node coordinates for export"""
-        return [string_to_coor(node) for node in list(self.nodes)]
+        return [self.coordinates[key] for key in self.nodes]
 
     # FIXME doesn't appear to be in use
     def faces_all(self):
         """get a list of faces as node ids for export"""
-        faces = []
-        nodes = list(self.nodes)
-        for face in self.faces:
-            faces.append([nodes.index(vertex) for vertex in face[0]])
-        return faces
+        ids = {key: position for position, key in enumerate(self.nodes)}
+        return [[ids[key] for key in face[0]] for face in self.faces]
 
     def segment(self):
-        """Utility to allocate index numbers to faces by contiguous region"""
-        if self.faces[0][2] == None:
-            # put first face in group 0
-            self.faces[0][2] = 0
-        indices_in_use = {}
-        dirty = True
-        while dirty == True:
-            dirty = False
-            for face in self.faces:
-                if face[2] == None:
-                    for node_str in face[0]:
-                        node = self.nodes[node_str]
-                        for face_ref in node:
-                            if not face_ref[2] == None:
-                                face[2] = face_ref[2]
-                                dirty = True
-                                continue
-                else:
-                    indices_in_use[face[2]] = True
-        index = len(list(indices_in_use))
+        """Utility to allocate index numbers to faces by contiguous region,
+        faces sharing a node are in the same region. Regions are numbered in
+        order of their first face, then filled by a depth-first search, each
+        face and node is visited once"""
         for face in self.faces:
-            if face[2] == None:
-                face[2] = index
-                self.segment()
+            face[2] = None
+        index = 0
+        visited = set()
+        for first_face in self.faces:
+            if first_face[2] != None:
+                continue
+            first_face[2] = index
+            # a stack, faces are labelled when found so each is only added once
+            todo = [first_face]
+            while todo:
+                face = todo.pop()
+                for key in face[0]:
+                    if key in visited:
+                        continue
+                    visited.add(key)
+                    for face_ref in self.nodes[key]:
+                        if face_ref[2] == None:
+                            face_ref[2] = index
+                            todo.append(face_ref)
+            index += 1
 
     def decompose(self):
         """Identify contiguous regions and return a list of new shells"""
@@ -73,7 +78,8 @@ class shell:
             group = face[2]
             if not group in results:
                 results[group] = shell()
-            results[group].add_facet(
-                [string_to_coor(node_str) for node_str in face[0]], face[1]
-            )
+            result = results[group]
+            for key in face[0]:
+                result.coordinates[key] = self.coordinates[key]
+            result.add_keys(list(face[0]), face[1])
         return list(results.values())
@@ -1,6 +1,7 @@
 """Overloads domain-specific methods onto topologic.Vertex"""
 
 import topologic
+from topologist.helpers import coor_to_key
 
 
 def CoorAsString(self):
@@ -8,4 +9,10 @@ def CoorAsString(self):
     return "__".join(str(item) for item in self.Coordinates())
 
 
+def CoorAsKey(self):
+    """Coordinates of this Vertex as a quantized tuple, see helpers.coor_to_key()"""
+    return coor_to_key(self.Coordinates())
+
+
 setattr(topologic.Vertex, "CoorAsString", CoorAsString)
+setattr(topologic.Vertex, "CoorAsKey", CoorAsKey)